@@ -0,0 +1,378 @@
+"""Local stand-in for the Grocy API with synthetic data."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from aiohttp import hdrs, web
+
+TIMESTAMP = "2024-01-01 08:00:00"
+FEATURES = [
+    "FEATURE_FLAG_STOCK",
+    "FEATURE_FLAG_SHOPPINGLIST",
+    "FEATURE_FLAG_RECIPES",
+    "FEATURE_FLAG_CHORES",
+    "FEATURE_FLAG_TASKS",
+    "FEATURE_FLAG_BATTERIES",
+]
+
+
+def _date(days: int) -> str:
+    """Return a Grocy date string relative to today."""
+    return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class FakeGrocy:
+    """aiohttp application that serves synthetic Grocy data.
+
+    Every request is counted in `requests`, keyed by route, so the
+    benchmarks can report how many calls an operation needs.
+    """
+
+    def __init__(
+        self,
+        stock: int = 1000,
+        chores: int = 200,
+        tasks: int = 200,
+        batteries: int = 50,
+        shopping_list: int = 100,
+        meal_plan: int = 30,
+        locations: int = 10,
+        picture_size: int = 200 * 1024,
+        latency: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Generate the datasets."""
+        rand = random.Random(seed)
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self.changed_time = TIMESTAMP
+
+        self.products = [
+            {
+                "id": product_id,
+                "name": f"Product {product_id}",
+                "description": None,
+                "location_id": rand.randint(1, locations),
+                "product_group_id": rand.randint(1, 20),
+                "qu_id_stock": 1,
+                "qu_id_purchase": 1,
+                "picture_file_name": f"product{product_id}.jpg",
+                "row_created_timestamp": TIMESTAMP,
+                "default_best_before_days": 7,
+            }
+            for product_id in range(1, stock + 1)
+        ]
+        self.stock = [
+            {
+                "product_id": product["id"],
+                "amount": rand.randint(1, 10),
+                "best_before_date": _date(rand.randint(-10, 60)),
+                "amount_opened": rand.randint(0, 1),
+                "amount_aggregated": 1,
+                "amount_opened_aggregated": 0,
+                "is_aggregated_amount": 0,
+                "product": product,
+            }
+            for product in self.products
+        ]
+        self.chores = [
+            {
+                "id": chore_id,
+                "name": f"Chore {chore_id}",
+                "period_type": "daily",
+                "track_date_only": 0,
+                "rollover": 0,
+                "next_estimated_execution_time": _date(rand.randint(-5, 10)),
+            }
+            for chore_id in range(1, chores + 1)
+        ]
+        self.tasks = [
+            {
+                "id": task_id,
+                "name": f"Task {task_id}",
+                "done": 0,
+                "due_date": _date(rand.randint(-5, 10))[:10],
+            }
+            for task_id in range(1, tasks + 1)
+        ]
+        self.batteries = [
+            {
+                "id": battery_id,
+                "name": f"Battery {battery_id}",
+                "charge_interval_days": 30,
+                "row_created_timestamp": TIMESTAMP,
+                "next_estimated_charge_time": _date(rand.randint(-5, 30)),
+            }
+            for battery_id in range(1, batteries + 1)
+        ]
+        self.shopping_list = [
+            {
+                "id": item_id,
+                "product_id": rand.randint(1, max(1, stock)),
+                "amount": rand.randint(1, 3),
+                "row_created_timestamp": TIMESTAMP,
+                "shopping_list_id": 1,
+                "done": 0,
+            }
+            for item_id in range(1, shopping_list + 1)
+        ]
+        self.meal_plan = [
+            {
+                "id": item_id,
+                "day": _date(item_id % 7)[:10],
+                "type": "recipe",
+                "recipe_id": item_id,
+                "recipe_servings": 2,
+                "section_id": 1,
+                "row_created_timestamp": TIMESTAMP,
+            }
+            for item_id in range(1, meal_plan + 1)
+        ]
+        self.stock_log = [
+            {
+                "id": log_id,
+                "product_id": entry["product_id"],
+                "amount": entry["amount"],
+                "transaction_type": "purchase",
+                "undone": 0,
+            }
+            for log_id, entry in enumerate(self.stock, start=1)
+        ]
+        self.picture = bytes(rand.getrandbits(8) for _ in range(picture_size))
+        self.picture_etag = f'"{hashlib.sha1(self.picture).hexdigest()}"'
+
+    def touch(self) -> None:
+        """Mark the database as changed, as any write in Grocy would."""
+        changed_time = datetime.strptime(self.changed_time, "%Y-%m-%d %H:%M:%S")
+        self.changed_time = str(changed_time + timedelta(seconds=1))
+
+    def consume(self, product_id: int, amount: float = 1) -> None:
+        """Consume an amount of a product and add it to the stock log."""
+        entry = next(item for item in self.stock if item["product_id"] == product_id)
+        entry["amount"] = max(0, entry["amount"] - amount)
+        if not entry["amount"]:
+            self.stock.remove(entry)
+        self.stock_log.append(
+            {
+                "id": self.stock_log[-1]["id"] + 1 if self.stock_log else 1,
+                "product_id": product_id,
+                "amount": -amount,
+                "transaction_type": "consume",
+                "undone": 0,
+            }
+        )
+        self.touch()
+
+    def application(self) -> web.Application:
+        """Return the aiohttp application serving the Grocy API."""
+        app = web.Application()
+        routes = [
+            ("/api/system/config", self._system_config),
+            ("/api/system/db-changed-time", self._db_changed_time),
+            ("/api/stock", self._stock),
+            ("/api/stock/volatile", self._volatile_stock),
+            ("/api/stock/products/{product_id}", self._product),
+            ("/api/chores", self._chores),
+            ("/api/chores/{chore_id}", self._chore),
+            ("/api/tasks", self._tasks),
+            ("/api/batteries", self._batteries),
+            ("/api/batteries/{battery_id}", self._battery),
+            ("/api/objects/shopping_list", self._shopping_list),
+            ("/api/objects/meal_plan", self._meal_plan),
+            ("/api/objects/meal_plan_sections", self._meal_plan_sections),
+            ("/api/objects/recipes/{recipe_id}", self._recipe),
+            ("/api/objects/stock_log", self._stock_log),
+            ("/api/files/{picture_type}/{filename}", self._picture),
+        ]
+        for path, handler in routes:
+            app.router.add_get(path, self._counted(path, handler))
+        return app
+
+    async def async_start(self) -> tuple[web.AppRunner, int]:
+        """Serve the API on a free local port and return the runner and port."""
+        runner = web.AppRunner(self.application())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, runner.addresses[0][1]
+
+    def _counted(self, path: str, handler):
+        """Count requests per route and add the configured latency."""
+
+        async def _handle(request: web.Request) -> web.StreamResponse:
+            self.requests[path] += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await handler(request)
+
+        return _handle
+
+    async def _system_config(self, request: web.Request) -> web.Response:
+        config: Dict[str, Any] = {
+            "USER_USERNAME": "benchmark",
+            "BASE_PATH": "",
+            "BASE_URL": "",
+            "MODE": "production",
+            "DEFAULT_LOCALE": "en",
+            "LOCALE": "en",
+            "CURRENCY": "EUR",
+        }
+        config.update({feature: True for feature in FEATURES})
+        return web.json_response(config)
+
+    async def _db_changed_time(self, request: web.Request) -> web.Response:
+        return web.json_response({"changed_time": self.changed_time})
+
+    async def _stock(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stock)
+
+    async def _volatile_stock(self, request: web.Request) -> web.Response:
+        count = len(self.stock)
+        return web.json_response(
+            {
+                "due_products": self.stock[: count // 20],
+                "overdue_products": self.stock[count // 20 : count // 10],
+                "expired_products": self.stock[count // 10 : count // 7],
+                "missing_products": [
+                    {
+                        "id": product["id"],
+                        "name": product["name"],
+                        "amount_missing": 1,
+                        "is_partly_in_stock": 0,
+                    }
+                    for product in self.products[: count // 100]
+                ],
+            }
+        )
+
+    async def _product(self, request: web.Request) -> web.Response:
+        product = self.products[int(request.match_info["product_id"]) - 1]
+        entry = next(
+            (item for item in self.stock if item["product_id"] == product["id"]),
+            {"amount": 0, "amount_opened": 0, "best_before_date": None},
+        )
+        unit = {"id": 1, "name": "Piece", "row_created_timestamp": TIMESTAMP}
+        return web.json_response(
+            {
+                "stock_amount": entry["amount"],
+                "stock_amount_opened": entry["amount_opened"],
+                "stock_amount_aggregated": entry["amount"],
+                "stock_amount_opened_aggregated": entry["amount_opened"],
+                "is_aggregated_amount": 0,
+                "next_due_date": entry["best_before_date"],
+                "product": product,
+                "quantity_unit_stock": unit,
+                "default_quantity_unit_purchase": unit,
+                "product_barcodes": [],
+            }
+        )
+
+    async def _chores(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [
+                {
+                    "chore_id": chore["id"],
+                    "next_estimated_execution_time": chore[
+                        "next_estimated_execution_time"
+                    ],
+                }
+                for chore in self.chores
+            ]
+        )
+
+    async def _chore(self, request: web.Request) -> web.Response:
+        chore = self.chores[int(request.match_info["chore_id"]) - 1]
+        return web.json_response(
+            {
+                "chore": {
+                    key: value
+                    for key, value in chore.items()
+                    if key != "next_estimated_execution_time"
+                },
+                "next_estimated_execution_time": chore["next_estimated_execution_time"],
+                "track_count": 1,
+            }
+        )
+
+    async def _tasks(self, request: web.Request) -> web.Response:
+        return web.json_response(self.tasks)
+
+    async def _batteries(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [
+                {
+                    "id": battery["id"],
+                    "next_estimated_charge_time": battery["next_estimated_charge_time"],
+                }
+                for battery in self.batteries
+            ]
+        )
+
+    async def _battery(self, request: web.Request) -> web.Response:
+        battery = self.batteries[int(request.match_info["battery_id"]) - 1]
+        return web.json_response(
+            {
+                "battery": {
+                    key: value
+                    for key, value in battery.items()
+                    if key != "next_estimated_charge_time"
+                },
+                "charge_cycles_count": 3,
+                "next_estimated_charge_time": battery["next_estimated_charge_time"],
+            }
+        )
+
+    async def _shopping_list(self, request: web.Request) -> web.Response:
+        return web.json_response(self.shopping_list)
+
+    async def _meal_plan(self, request: web.Request) -> web.Response:
+        return web.json_response(self.meal_plan)
+
+    async def _meal_plan_sections(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [{"id": 1, "name": "Dinner", "row_created_timestamp": TIMESTAMP}]
+        )
+
+    async def _recipe(self, request: web.Request) -> web.Response:
+        recipe_id = int(request.match_info["recipe_id"])
+        return web.json_response(
+            {
+                "id": recipe_id,
+                "name": f"Recipe {recipe_id}",
+                "base_servings": 2,
+                "desired_servings": 2,
+                "picture_file_name": f"recipe{recipe_id}.jpg",
+                "row_created_timestamp": TIMESTAMP,
+            }
+        )
+
+    async def _stock_log(self, request: web.Request) -> web.Response:
+        entries = self.stock_log
+        for query in request.query.getall("query[]", []):
+            if query.startswith("id>"):
+                after_id = int(query[3:])
+                entries = [entry for entry in entries if entry["id"] > after_id]
+        if request.query.get("order") == "id:desc":
+            entries = entries[::-1]
+        if "limit" in request.query:
+            entries = entries[: int(request.query["limit"])]
+        return web.json_response(entries)
+
+    async def _picture(self, request: web.Request) -> web.Response:
+        if request.headers.get(hdrs.IF_NONE_MATCH) == self.picture_etag:
+            return web.Response(status=304)
+        return web.Response(
+            body=self.picture,
+            content_type="image/jpeg",
+            headers={hdrs.ETAG: self.picture_etag},
+        )
+
+
+def summary(requests: Counter[str]) -> List[str]:
+    """Request counts per route, most requested first."""
+    return [f"{count:6d} {path}" for path, count in requests.most_common()]
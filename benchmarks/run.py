@@ -0,0 +1,349 @@
+"""Benchmark the Grocy integration against a local fake Grocy server.
+
+Run from the repository root:
+
+    python -m benchmarks.run --stock 5000 --chores 2000 --tasks 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import statistics
+import tempfile
+import tracemalloc
+from collections import Counter
+from time import perf_counter
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List
+
+from aiohttp import ClientSession, web
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.grocy.binary_sensor import (
+    BINARY_SENSORS,
+    GrocyBinarySensorEntity,
+)
+from custom_components.grocy.const import (
+    ATTRIBUTE_MODE_OPTIONS,
+    ATTRIBUTE_MODES,
+    CONF_API_KEY,
+    CONF_INCREMENTAL_STOCK_SYNC,
+    CONF_PORT,
+    CONF_URL,
+    CONF_VERIFY_SSL,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_REQUEST_TIMEOUT,
+    DOMAIN,
+    PICTURE_CACHE_MAX_ENTRY_SIZE,
+)
+from custom_components.grocy.coordinator import GrocyDataUpdateCoordinator
+from custom_components.grocy.grocy_data import GrocyPictureView
+from custom_components.grocy.picture_cache import GrocyPictureCache
+from custom_components.grocy.sensor import SENSORS, GrocySensorEntity
+from custom_components.grocy.transport import async_create_session
+
+from .fake_grocy import FakeGrocy, summary
+
+Results = Dict[str, Any]
+
+
+def _config_entry(port: int, options: Dict[str, Any]) -> ConfigEntry:
+    """Return a config entry for the fake server.
+
+    Only the arguments known to the installed Home Assistant version are passed.
+    """
+    arguments = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": "Grocy benchmark",
+        "data": {
+            CONF_URL: "http://127.0.0.1",
+            CONF_API_KEY: "benchmark",
+            CONF_PORT: port,
+            CONF_VERIFY_SSL: False,
+        },
+        "options": options,
+        "source": config_entries.SOURCE_USER,
+        "unique_id": None,
+        "discovery_keys": MappingProxyType({}),
+        "subentries_data": None,
+    }
+    parameters = inspect.signature(ConfigEntry).parameters
+    return ConfigEntry(
+        **{name: value for name, value in arguments.items() if name in parameters}
+    )
+
+
+def _coordinator(hass: HomeAssistant, entry: ConfigEntry) -> GrocyDataUpdateCoordinator:
+    """Return a coordinator with an entity for every description."""
+    config_entries.current_entry.set(entry)
+    coordinator = GrocyDataUpdateCoordinator(hass)
+    coordinator.available_entities = [description.key for description in SENSORS] + [
+        description.key for description in BINARY_SENSORS
+    ]
+    coordinator.entities = [
+        GrocySensorEntity(coordinator, description, entry) for description in SENSORS
+    ] + [
+        GrocyBinarySensorEntity(coordinator, description, entry)
+        for description in BINARY_SENSORS
+    ]
+    return coordinator
+
+
+def _percentiles(samples: List[float]) -> Results:
+    """Return latency percentiles in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(sample * 1000 for sample in samples)
+
+    def _at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "n": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": _at(0.50),
+        "p95": _at(0.95),
+        "p99": _at(0.99),
+        "max": ordered[-1],
+    }
+
+
+async def _measure(
+    run: Callable[[], Awaitable[Any]], iterations: int, fake: FakeGrocy
+) -> Results:
+    """Time `run` and record the peak memory and requests of a traced extra run."""
+    samples = []
+    for _ in range(iterations):
+        start = perf_counter()
+        await run()
+        samples.append(perf_counter() - start)
+
+    fake.requests.clear()
+    tracemalloc.start()
+    await run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        **_percentiles(samples),
+        "peak_kib": peak / 1024,
+        "requests": sum(fake.requests.values()),
+        "routes": Counter(fake.requests),
+    }
+
+
+async def bench_refresh(
+    hass: HomeAssistant, fake: FakeGrocy, port: int, args
+) -> Results:
+    """Time cold, changed and unchanged coordinator refreshes."""
+    entry = _config_entry(port, {})
+    results: Results = {}
+
+    async def _cold() -> None:
+        coordinator = _coordinator(hass, entry)
+        try:
+            await coordinator.async_refresh()
+        finally:
+            await coordinator.async_shutdown()
+        if not coordinator.last_update_success:
+            raise RuntimeError(coordinator.last_exception)
+
+    results["refresh (cold)"] = await _measure(_cold, args.iterations, fake)
+
+    # Every dataset is due on each refresh, the database changed time decides
+    # whether it is fetched again.
+    coordinator = _coordinator(hass, entry)
+    coordinator.refresh_intervals = dict.fromkeys(coordinator.refresh_intervals, 0)
+    await coordinator.async_refresh()
+
+    async def _changed() -> None:
+        fake.touch()
+        await coordinator.async_refresh()
+
+    async def _unchanged() -> None:
+        await coordinator.async_refresh()
+
+    results["refresh (db changed)"] = await _measure(_changed, args.iterations, fake)
+    results["refresh (db unchanged)"] = await _measure(
+        _unchanged, args.iterations, fake
+    )
+    await coordinator.async_shutdown()
+
+    # One product is consumed before each refresh.
+    for label, options in (
+        ("full stock", {}),
+        ("stock log", {CONF_INCREMENTAL_STOCK_SYNC: True}),
+    ):
+        coordinator = _coordinator(hass, _config_entry(port, options))
+        coordinator.refresh_intervals = dict.fromkeys(coordinator.refresh_intervals, 0)
+        await coordinator.async_refresh()
+
+        async def _consume(coordinator=coordinator) -> None:
+            if fake.stock:
+                fake.consume(fake.stock[-1]["product_id"])
+            await coordinator.async_refresh()
+
+        results[f"refresh (consume, {label})"] = await _measure(
+            _consume, args.iterations, fake
+        )
+        await coordinator.async_shutdown()
+    return results
+
+
+async def bench_attributes(
+    hass: HomeAssistant, fake: FakeGrocy, port: int, args
+) -> Results:
+    """Time the attribute generation of all entities in every attribute mode."""
+    results: Results = {}
+    for mode in ATTRIBUTE_MODES:
+        entry = _config_entry(
+            port, {option: mode for option in ATTRIBUTE_MODE_OPTIONS.values()}
+        )
+        coordinator = _coordinator(hass, entry)
+        await coordinator.async_refresh()
+
+        async def _build(coordinator=coordinator) -> None:
+            for entity in coordinator.entities:
+                data = coordinator.data.get(entity.entity_description.key)
+                entity._build_attributes(data)  # pylint: disable=protected-access
+
+        results[f"attributes ({mode})"] = await _measure(_build, args.iterations, fake)
+        await coordinator.async_shutdown()
+    return results
+
+
+async def bench_pictures(
+    hass: HomeAssistant, fake: FakeGrocy, port: int, args
+) -> Results:
+    """Time concurrent picture proxy requests with and without the cache."""
+    results: Results = {}
+    memory_cache = GrocyPictureCache(
+        hass, 64 * 1024 * 1024, PICTURE_CACHE_MAX_ENTRY_SIZE * 1024 * 1024
+    )
+    for label, cache in (("no cache", None), ("memory cache", memory_cache)):
+        async with async_create_session(
+            False, DEFAULT_POOL_SIZE, DEFAULT_REQUEST_TIMEOUT, True
+        ) as upstream:
+            view = GrocyPictureView(
+                upstream, f"http://127.0.0.1:{port}", "benchmark", cache
+            )
+
+            async def _handle(request: web.Request, view=view) -> web.StreamResponse:
+                return await view.get(request, **request.match_info)
+
+            app = web.Application()
+            app.router.add_get(view.url, _handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            proxy_port = runner.addresses[0][1]
+
+            async with ClientSession() as client:
+                latencies: List[float] = []
+                semaphore = asyncio.Semaphore(args.concurrency)
+                base_url = f"http://127.0.0.1:{proxy_port}/api/grocy/productpictures"
+
+                async def _request(number: int, client=client) -> None:
+                    url = f"{base_url}/product{number % args.pictures}.jpg"
+                    async with semaphore:
+                        start = perf_counter()
+                        async with client.get(url) as response:
+                            await response.read()
+                        latencies.append(perf_counter() - start)
+
+                async def _burst() -> None:
+                    await asyncio.gather(
+                        *(_request(number) for number in range(args.picture_requests))
+                    )
+
+                result = await _measure(_burst, args.iterations, fake)
+                result.update(_percentiles(latencies))
+                results[f"pictures ({label})"] = result
+
+            await runner.cleanup()
+    return results
+
+
+def _report(results: Results, verbose: bool) -> None:
+    """Print a table of the results."""
+    print(
+        f"{'scenario':30} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'max ms':>9} {'peak KiB':>10} {'requests':>9}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:30} {result['n']:5d} {result['p50']:9.2f} {result['p95']:9.2f} "
+            f"{result['p99']:9.2f} {result['max']:9.2f} {result['peak_kib']:10.0f} "
+            f"{result['requests']:9d}"
+        )
+        if verbose:
+            for line in summary(result["routes"]):
+                print(f"    {line}")
+
+
+async def main(args) -> None:
+    """Run the benchmarks."""
+    fake = FakeGrocy(
+        stock=args.stock,
+        chores=args.chores,
+        tasks=args.tasks,
+        batteries=args.batteries,
+        shopping_list=args.shopping_list,
+        meal_plan=args.meal_plan,
+        picture_size=args.picture_size * 1024,
+        latency=args.latency / 1000,
+    )
+    runner, port = await fake.async_start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        results: Results = {}
+        try:
+            for bench in (bench_refresh, bench_attributes, bench_pictures):
+                if args.only and bench.__name__.removeprefix("bench_") not in args.only:
+                    continue
+                results.update(await bench(hass, fake, port, args))
+        finally:
+            await runner.cleanup()
+            await hass.async_stop(force=True)
+
+    _report(results, args.verbose)
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stock", type=int, default=1000, help="products in stock")
+    parser.add_argument("--chores", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--batteries", type=int, default=50)
+    parser.add_argument("--shopping-list", type=int, default=100)
+    parser.add_argument("--meal-plan", type=int, default=30)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="server latency per request in ms"
+    )
+    parser.add_argument("--pictures", type=int, default=20, help="distinct pictures")
+    parser.add_argument("--picture-requests", type=int, default=200)
+    parser.add_argument("--picture-size", type=int, default=200, help="size in KiB")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=("refresh", "attributes", "pictures"),
+        help="run only these benchmarks",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="show requests per route"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
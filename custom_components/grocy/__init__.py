@@ -6,11 +6,14 @@ https://github.com/custom-components/grocy
 """
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import List
+from typing import List, Set
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
 from .const import (
     ATTR_BATTERIES,
@@ -26,13 +29,21 @@ from .const import (
     ATTR_SHOPPING_LIST,
     ATTR_STOCK,
     ATTR_TASKS,
+    DATASETS,
     DOMAIN,
     PLATFORMS,
+    SIGNAL_UNLOADED,
     STARTUP_MESSAGE,
 )
 from .coordinator import GrocyDataUpdateCoordinator
-from .grocy_data import GrocyData, async_setup_endpoint_for_image_proxy
+from .grocy_data import (
+    GrocyData,
+    async_setup_endpoint_for_image_proxy,
+    async_unload_endpoint_for_image_proxy,
+)
 from .services import async_setup_services, async_unload_services
+from .snapshot import GrocySnapshotStore
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,16 +53,37 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     _LOGGER.info(STARTUP_MESSAGE)
 
     coordinator: GrocyDataUpdateCoordinator = GrocyDataUpdateCoordinator(hass)
-    coordinator.available_entities = await _async_get_available_entities(
-        coordinator.grocy_data
-    )
-    await coordinator.async_config_entry_first_refresh()
-    hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN] = coordinator
 
-    await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    # Registering the services, picture proxy and websocket commands needs no
+    # answer from Grocy, so it doesn't wait for the first refresh.
     await async_setup_services(hass, config_entry)
-    await async_setup_endpoint_for_image_proxy(hass, config_entry.data)
+    await async_setup_endpoint_for_image_proxy(
+        hass, config_entry, coordinator.session
+    )
+    async_setup_websocket_api(hass)
+
+    try:
+        restored = await coordinator.async_restore_snapshot()
+        if not restored:
+            await _async_first_refresh(hass, config_entry, coordinator)
+    except Exception:
+        await async_unload_services(hass)
+        async_unload_endpoint_for_image_proxy(hass)
+        del hass.data[DOMAIN]
+        raise
+
+    await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    config_entry.async_on_unload(config_entry.add_update_listener(async_reload_entry))
+
+    if restored:
+        # The entities were set up from the stored data, the enabled entities
+        # are known now so the live refresh fetches what they need.
+        config_entry.async_create_background_task(
+            hass,
+            _async_refresh_restored(hass, config_entry, coordinator),
+            f"{DOMAIN} refresh of restored data",
+        )
 
     return True
 
@@ -59,14 +91,90 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     await async_unload_services(hass)
+    async_unload_endpoint_for_image_proxy(hass)
     if unloaded := await hass.config_entries.async_unload_platforms(
         config_entry, PLATFORMS
     ):
+        async_dispatcher_send(hass, SIGNAL_UNLOADED)
         del hass.data[DOMAIN]
 
     return unloaded
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the stored data of a removed config entry."""
+    await GrocySnapshotStore(hass, config_entry.entry_id).async_remove()
+
+
+async def async_reload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Reload config entry when its options change."""
+    await hass.config_entries.async_reload(config_entry.entry_id)
+
+
+async def _async_first_refresh(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator: GrocyDataUpdateCoordinator,
+) -> None:
+    """Detect the enabled Grocy features while running the first refresh.
+
+    The first refresh fetches the datasets of the entities that are enabled in
+    the entity registry and the required datasets, so they have data as soon as
+    the entities are set up.
+    """
+    coordinator.initial_datasets = (
+        _async_registered_datasets(hass, config_entry) | coordinator.required_datasets
+    )
+    try:
+        coordinator.available_entities, _ = await asyncio.gather(
+            _async_get_available_entities(coordinator.grocy_data),
+            coordinator.async_config_entry_first_refresh(),
+        )
+    finally:
+        coordinator.initial_datasets = set()
+
+
+@callback
+def _async_registered_datasets(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> Set[str]:
+    """Return the datasets of the enabled entities in the entity registry."""
+    prefix = config_entry.entry_id
+    return {
+        entry.unique_id[len(prefix) :]
+        for entry in er.async_entries_for_config_entry(
+            er.async_get(hass), config_entry.entry_id
+        )
+        if not entry.disabled
+        and entry.unique_id.startswith(prefix)
+        and entry.unique_id[len(prefix) :] in DATASETS
+    }
+
+
+async def _async_refresh_restored(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator: GrocyDataUpdateCoordinator,
+) -> None:
+    """Check the enabled Grocy features, then refresh the restored data.
+
+    The entry is reloaded if the features changed since the data was stored.
+    """
+    try:
+        available_entities = await _async_get_available_entities(
+            coordinator.grocy_data
+        )
+    except Exception as error:  # pylint: disable=broad-except
+        _LOGGER.debug("Could not get the Grocy configuration: %s", error)
+    else:
+        if available_entities and available_entities != coordinator.available_entities:
+            _LOGGER.debug("Enabled Grocy features changed, reloading")
+            hass.config_entries.async_schedule_reload(config_entry.entry_id)
+            return
+
+    await coordinator.async_refresh()
+
+
 async def _async_get_available_entities(grocy_data: GrocyData) -> List[str]:
     """Return a list of available entities based on enabled Grocy features."""
     available_entities = []
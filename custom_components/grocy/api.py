@@ -0,0 +1,726 @@
+"""Asynchronous client for the Grocy API."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Tuple
+
+from aiohttp import (
+    ClientError,
+    ClientSession,
+    ClientTimeout,
+    ServerDisconnectedError,
+    hdrs,
+)
+from pygrocy2.data_models.battery import Battery
+from pygrocy2.data_models.chore import Chore
+from pygrocy2.data_models.generic import EntityType
+from pygrocy2.data_models.meal_items import MealPlanItem
+from pygrocy2.data_models.product import Product, ShoppingListProduct
+from pygrocy2.data_models.system import SystemConfig, SystemInfo
+from pygrocy2.data_models.task import Task
+from pygrocy2.grocy_api_client import (
+    BatteryDetailsResponse,
+    ChoreDetailsResponse,
+    CurrentBatteryResponse,
+    CurrentChoreResponse,
+    CurrentStockResponse,
+    CurrentVolatilStockResponse,
+    MealPlanResponse,
+    MealPlanSectionResponse,
+    ProductDetailsResponse,
+    RecipeDetailsResponse,
+    ShoppingListItem,
+    SystemConfigDto,
+    SystemInfoDto,
+    TaskResponse,
+    TransactionType,
+)
+from pygrocy2.utils import grocy_datetime_str, localize_datetime, parse_date
+
+from .const import (
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_PORT,
+    DEFAULT_REQUEST_TIMEOUT,
+)
+from .metrics import GrocyMetrics, endpoint_name
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GrocyApiError(Exception):
+    """Error response from the Grocy API."""
+
+    def __init__(self, status_code: int, message: str | None = None) -> None:
+        """Initialize the error."""
+        super().__init__(message or f"Grocy API returned status {status_code}")
+        self.status_code = status_code
+        self.message = message
+
+
+class GrocyNotModified(Exception):
+    """The response of a conditional request is the same as the last one."""
+
+
+class ResponseValidators:
+    """Validators of the last response of a list request.
+
+    Grocy itself sends no ETag or Last-Modified header, only a proxy in front
+    of it may, so the hash of the body is compared as well.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty validators."""
+        self.request: Tuple[str, Tuple[str, ...]] | None = None
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.digest: bytes | None = None
+
+    def headers(self, request: Tuple[str, Tuple[str, ...]]) -> Dict[str, str]:
+        """Return the conditional request headers for a request."""
+        headers = {}
+        if request == self.request:
+            if self.etag:
+                headers[hdrs.IF_NONE_MATCH] = self.etag
+            if self.last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = self.last_modified
+        return headers
+
+
+class PrefetchedDetails:
+    """Serve already fetched detail responses to the pygrocy get_details methods."""
+
+    def __init__(self) -> None:
+        """Initialize empty detail lookups."""
+        self.products: Dict[int, ProductDetailsResponse | None] = {}
+        self.chores: Dict[int, ChoreDetailsResponse | None] = {}
+        self.batteries: Dict[int, BatteryDetailsResponse | None] = {}
+        self.recipes: Dict[int, RecipeDetailsResponse | None] = {}
+        self.meal_plan_sections: Dict[int, MealPlanSectionResponse | None] = {}
+
+    def get_product(self, product_id: int) -> ProductDetailsResponse | None:
+        """Return product details."""
+        return self.products.get(product_id)
+
+    def get_chore(self, chore_id: int) -> ChoreDetailsResponse | None:
+        """Return chore details."""
+        return self.chores.get(chore_id)
+
+    def get_battery(self, battery_id: int) -> BatteryDetailsResponse | None:
+        """Return battery details."""
+        return self.batteries.get(battery_id)
+
+    def get_recipe(self, recipe_id: int) -> RecipeDetailsResponse | None:
+        """Return recipe details."""
+        return self.recipes.get(recipe_id)
+
+    def get_meal_plan_section(self, section_id: int) -> MealPlanSectionResponse | None:
+        """Return meal plan section details."""
+        return self.meal_plan_sections.get(section_id)
+
+
+class GrocyApi:
+    """Asynchronous Grocy API client using an aiohttp session."""
+
+    def __init__(
+        self,
+        session: ClientSession,
+        base_url: str,
+        api_key: str,
+        port: int = DEFAULT_PORT,
+        path: str | None = None,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        metrics: GrocyMetrics | None = None,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> None:
+        """Initialize the client."""
+        self._session = session
+        self._metrics = metrics
+        if path:
+            self._base_url = f"{base_url}:{port}/{path}/api/"
+        else:
+            self._base_url = f"{base_url}:{port}/api/"
+
+        self._headers = {hdrs.ACCEPT: "application/json"}
+        if api_key != "demo_mode":
+            self._headers["GROCY-API-KEY"] = api_key
+
+        self._max_concurrent_requests = max(1, max_concurrent_requests)
+        self._timeout = ClientTimeout(total=request_timeout)
+
+    async def _request(
+        self,
+        method: str,
+        end_url: str,
+        query_filters: List[str] | None = None,
+        data: Any = None,
+        validators: ResponseValidators | None = None,
+        params: Dict[str, str] | None = None,
+    ) -> Any:
+        """Send a request and return the decoded JSON body, if any.
+
+        With validators, raises GrocyNotModified if the response is the same
+        as the last one, otherwise the validators are updated.
+        """
+        query = [("query[]", query_filter) for query_filter in query_filters or ()]
+        query.extend((params or {}).items())
+
+        headers = self._headers
+        request = (end_url, tuple(query_filters or ()))
+        if validators is not None:
+            headers = {**headers, **validators.headers(request)}
+
+        start = perf_counter()
+        try:
+            status, body, response_headers = await self._send(
+                method, end_url, query or None, data, headers
+            )
+        except (ClientError, asyncio.TimeoutError):
+            self._record(method, end_url, perf_counter() - start, 0, error=True)
+            raise
+        duration = perf_counter() - start
+        _LOGGER.debug("%s /%s returned %d", method, end_url, status)
+
+        if status >= 400:
+            self._record(method, end_url, duration, len(body), error=True)
+            message = None
+            if body:
+                try:
+                    message = json.loads(body).get("error_message")
+                except (ValueError, AttributeError):
+                    message = body.decode(errors="replace")
+            raise GrocyApiError(status, message)
+
+        if validators is not None:
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            if status == 304 or digest == validators.digest:
+                self._record(method, end_url, duration, len(body), unchanged=True)
+                raise GrocyNotModified
+
+            validators.request = request
+            validators.etag = response_headers.get(hdrs.ETAG)
+            validators.last_modified = response_headers.get(hdrs.LAST_MODIFIED)
+            validators.digest = digest
+
+        parsed_json = None
+        decode_start = perf_counter()
+        if body:
+            parsed_json = json.loads(body)
+        self._record(
+            method,
+            end_url,
+            duration,
+            len(body),
+            decode_time=perf_counter() - decode_start,
+        )
+        return parsed_json
+
+    async def _send(
+        self,
+        method: str,
+        end_url: str,
+        params: Any,
+        data: Any,
+        headers: Mapping[str, str],
+    ) -> Tuple[int, bytes, Mapping[str, str]]:
+        """Send a request and return the status, body and headers.
+
+        A GET is sent once more if Grocy closed the kept alive connection just
+        as it was reused.
+        """
+        retry = method == hdrs.METH_GET
+        while True:
+            try:
+                async with self._session.request(
+                    method,
+                    f"{self._base_url}{end_url}",
+                    headers=headers,
+                    params=params,
+                    json=data,
+                    timeout=self._timeout,
+                ) as resp:
+                    return resp.status, await resp.read(), resp.headers
+            except ServerDisconnectedError:
+                if not retry:
+                    raise
+                retry = False
+                _LOGGER.debug("Grocy closed the connection, retrying /%s", end_url)
+
+    def _record(self, method: str, end_url: str, duration: float, size: int, **kwargs):
+        """Record the metrics of a request if metrics are collected."""
+        if self._metrics is not None:
+            self._metrics.record_request(
+                endpoint_name(method, end_url), duration, size, **kwargs
+            )
+
+    async def _get(
+        self,
+        end_url: str,
+        query_filters: List[str] | None = None,
+        validators: ResponseValidators | None = None,
+        params: Dict[str, str] | None = None,
+    ) -> Any:
+        return await self._request(
+            hdrs.METH_GET, end_url, query_filters, validators=validators, params=params
+        )
+
+    async def _post(self, end_url: str, data: Any = None) -> Any:
+        return await self._request(hdrs.METH_POST, end_url, data=data)
+
+    async def _gather_details(
+        self,
+        fetch: Callable[[int], Awaitable[Any]],
+        ids: Iterable[int | None],
+        details: Dict[int, Any],
+    ) -> None:
+        """Fetch details for each distinct id, bounded by the concurrency cap."""
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+        unique_ids = list({item_id for item_id in ids if item_id})
+
+        async def _fetch(item_id: int) -> Any:
+            async with semaphore:
+                return await fetch(item_id)
+
+        results = await asyncio.gather(*(_fetch(item_id) for item_id in unique_ids))
+        details.update(zip(unique_ids, results))
+
+    async def _product_details(
+        self, products: List[Product] | List[ShoppingListProduct], attribute: str
+    ) -> PrefetchedDetails:
+        prefetched = PrefetchedDetails()
+        await self._gather_details(
+            self.get_product,
+            (getattr(item, attribute) for item in products),
+            prefetched.products,
+        )
+        return prefetched
+
+    async def get_stock(
+        self, validators: ResponseValidators | None = None
+    ) -> List[CurrentStockResponse]:
+        """Return the current stock."""
+        parsed_json = await self._get("stock", validators=validators)
+        if parsed_json:
+            return [CurrentStockResponse(**response) for response in parsed_json]
+        return []
+
+    async def get_volatile_stock(
+        self, validators: ResponseValidators | None = None
+    ) -> CurrentVolatilStockResponse:
+        """Return due, overdue, expired and missing products."""
+        parsed_json = await self._get("stock/volatile", validators=validators)
+        return CurrentVolatilStockResponse(**parsed_json)
+
+    async def get_product(self, product_id: int) -> ProductDetailsResponse | None:
+        """Return product details."""
+        parsed_json = await self._get(f"stock/products/{product_id}")
+        if parsed_json:
+            return ProductDetailsResponse(**parsed_json)
+        return None
+
+    async def get_products(
+        self, product_ids: Iterable[int]
+    ) -> Dict[int, ProductDetailsResponse | None]:
+        """Return the details of each product."""
+        details: Dict[int, ProductDetailsResponse | None] = {}
+        await self._gather_details(self.get_product, product_ids, details)
+        return details
+
+    async def get_products_stock(
+        self, product_ids: Iterable[int]
+    ) -> Dict[int, Tuple[CurrentStockResponse | None, int | None]]:
+        """Return the stock entry and parent product id of each product.
+
+        The stock entry is built from the product details the same way it is
+        listed in the current stock, and is None if the product is not in stock.
+        """
+        responses: Dict[int, Any] = {}
+        await self._gather_details(
+            lambda product_id: self._get(f"stock/products/{product_id}"),
+            product_ids,
+            responses,
+        )
+
+        stock = {}
+        for product_id, parsed_json in responses.items():
+            if not parsed_json:
+                stock[product_id] = (None, None)
+                continue
+
+            product = parsed_json["product"]
+            amount = float(parsed_json.get("stock_amount") or 0)
+            amount_opened = float(parsed_json.get("stock_amount_opened") or 0)
+            amount_aggregated = float(
+                parsed_json.get("stock_amount_aggregated") or amount
+            )
+            entry = None
+            if amount or amount_aggregated:
+                entry = CurrentStockResponse(
+                    product_id=product_id,
+                    amount=amount,
+                    # Grocy lists products that never expire with this date.
+                    best_before_date=parsed_json.get("next_due_date")
+                    or parsed_json.get("next_best_before_date")
+                    or "2999-12-31",
+                    amount_opened=amount_opened,
+                    amount_aggregated=amount_aggregated,
+                    amount_opened_aggregated=parsed_json.get(
+                        "stock_amount_opened_aggregated"
+                    )
+                    or amount_opened,
+                    is_aggregated_amount=parsed_json.get("is_aggregated_amount")
+                    or False,
+                    product=product,
+                )
+            parent_id = product.get("parent_product_id")
+            stock[product_id] = (entry, int(parent_id) if parent_id else None)
+        return stock
+
+    async def get_stock_log(
+        self, after_id: int | None = None, limit: int | None = None
+    ) -> List[Dict[str, Any]]:
+        """Return the stock log entries after an id, all of them if there is none.
+
+        Without an id, the newest entries are returned first.
+        """
+        if after_id is None:
+            query_filters = None
+            params = {"order": "id:desc"}
+        else:
+            query_filters = [f"id>{after_id}"]
+            params = {"order": "id:asc"}
+        if limit is not None:
+            params["limit"] = str(limit)
+
+        return await self._get("objects/stock_log", query_filters, params=params) or []
+
+    async def _volatile_products(
+        self, attribute: str, get_details: bool
+    ) -> List[Product]:
+        raw_products = getattr(await self.get_volatile_stock(), attribute) or []
+        products = [Product(response) for response in raw_products]
+
+        if get_details:
+            prefetched = await self._product_details(products, "id")
+            for item in products:
+                item.get_details(prefetched)
+        return products
+
+    async def due_products(self, get_details: bool = False) -> List[Product]:
+        """Return products due soon."""
+        return await self._volatile_products("due_products", get_details)
+
+    async def overdue_products(self, get_details: bool = False) -> List[Product]:
+        """Return overdue products."""
+        return await self._volatile_products("overdue_products", get_details)
+
+    async def expired_products(self, get_details: bool = False) -> List[Product]:
+        """Return expired products."""
+        return await self._volatile_products("expired_products", get_details)
+
+    async def missing_products(self, get_details: bool = False) -> List[Product]:
+        """Return products below their minimum stock amount."""
+        return await self._volatile_products("missing_products", get_details)
+
+    async def get_chore(self, chore_id: int) -> ChoreDetailsResponse | None:
+        """Return chore details."""
+        parsed_json = await self._get(f"chores/{chore_id}")
+        if parsed_json:
+            return ChoreDetailsResponse(**parsed_json)
+        return None
+
+    async def chores(
+        self,
+        get_details: bool = False,
+        query_filters: List[str] | None = None,
+        validators: ResponseValidators | None = None,
+    ) -> List[Chore]:
+        """Return chores."""
+        parsed_json = await self._get("chores", query_filters, validators)
+        chores = [Chore(CurrentChoreResponse(**chore)) for chore in parsed_json or []]
+
+        if get_details:
+            prefetched = PrefetchedDetails()
+            await self._gather_details(
+                self.get_chore, (chore.id for chore in chores), prefetched.chores
+            )
+            for chore in chores:
+                chore.get_details(prefetched)
+        return chores
+
+    async def tasks(
+        self,
+        query_filters: List[str] | None = None,
+        validators: ResponseValidators | None = None,
+    ) -> List[Task]:
+        """Return tasks."""
+        parsed_json = await self._get("tasks", query_filters, validators)
+        return [Task(TaskResponse(**data)) for data in parsed_json or []]
+
+    async def shopping_list(
+        self,
+        get_details: bool = False,
+        query_filters: List[str] | None = None,
+        validators: ResponseValidators | None = None,
+    ) -> List[ShoppingListProduct]:
+        """Return all shopping list items."""
+        parsed_json = await self._get(
+            "objects/shopping_list", query_filters, validators
+        )
+        shopping_list = [
+            ShoppingListProduct(ShoppingListItem(**response))
+            for response in parsed_json or []
+        ]
+
+        if get_details:
+            prefetched = await self._product_details(shopping_list, "product_id")
+            for item in shopping_list:
+                item.get_details(prefetched)
+        return shopping_list
+
+    async def get_recipe(self, recipe_id: int) -> RecipeDetailsResponse | None:
+        """Return recipe details."""
+        parsed_json = await self._get(f"objects/recipes/{recipe_id}")
+        if parsed_json:
+            return RecipeDetailsResponse(**parsed_json)
+        return None
+
+    async def get_meal_plan_section(
+        self, section_id: int
+    ) -> MealPlanSectionResponse | None:
+        """Return meal plan section details."""
+        parsed_json = await self._get(
+            "objects/meal_plan_sections", [f"id={section_id}"]
+        )
+        if parsed_json and len(parsed_json) == 1:
+            return MealPlanSectionResponse(**parsed_json[0])
+        return None
+
+    async def meal_plan(
+        self,
+        get_details: bool = False,
+        query_filters: List[str] | None = None,
+        validators: ResponseValidators | None = None,
+    ) -> List[MealPlanItem]:
+        """Return meal plan items."""
+        parsed_json = await self._get("objects/meal_plan", query_filters, validators)
+        meal_plan = [
+            MealPlanItem(MealPlanResponse(**data)) for data in parsed_json or []
+        ]
+
+        if get_details:
+            prefetched = PrefetchedDetails()
+            await asyncio.gather(
+                self._gather_details(
+                    self.get_recipe,
+                    (item.recipe_id for item in meal_plan),
+                    prefetched.recipes,
+                ),
+                self._gather_details(
+                    self.get_meal_plan_section,
+                    (item.section_id for item in meal_plan),
+                    prefetched.meal_plan_sections,
+                ),
+            )
+            for item in meal_plan:
+                item.get_details(prefetched)
+        return meal_plan
+
+    async def get_battery(self, battery_id: int) -> BatteryDetailsResponse | None:
+        """Return battery details."""
+        parsed_json = await self._get(f"batteries/{battery_id}")
+        if parsed_json:
+            return BatteryDetailsResponse(**parsed_json)
+        return None
+
+    async def batteries(
+        self,
+        query_filters: List[str] | None = None,
+        get_details: bool = False,
+        validators: ResponseValidators | None = None,
+    ) -> List[Battery]:
+        """Return batteries."""
+        parsed_json = await self._get("batteries", query_filters, validators)
+        batteries = [
+            Battery(CurrentBatteryResponse(**data)) for data in parsed_json or []
+        ]
+
+        if get_details:
+            prefetched = PrefetchedDetails()
+            await self._gather_details(
+                self.get_battery, (item.id for item in batteries), prefetched.batteries
+            )
+            for item in batteries:
+                item.get_details(prefetched)
+        return batteries
+
+    async def get_last_db_changed(self) -> datetime | None:
+        """Return the time Grocy's database was last changed."""
+        parsed_json = await self._get("system/db-changed-time")
+        if parsed_json:
+            return parse_date(parsed_json.get("changed_time"))
+        return None
+
+    async def get_system_info(self) -> SystemInfo | None:
+        """Return Grocy system information."""
+        parsed_json = await self._get("system/info")
+        if parsed_json:
+            return SystemInfo(SystemInfoDto(**parsed_json))
+        return None
+
+    async def get_system_config(self) -> SystemConfig | None:
+        """Return the Grocy system configuration."""
+        parsed_json = await self._get("system/config")
+        if parsed_json:
+            return SystemConfig(SystemConfigDto(**parsed_json))
+        return None
+
+    async def add_product(
+        self,
+        product_id: int,
+        amount: float,
+        price: float | str,
+        best_before_date: datetime | None = None,
+        transaction_type: TransactionType = TransactionType.PURCHASE,
+    ) -> Any:
+        """Add an amount of a product to the stock."""
+        data = {
+            "amount": amount,
+            "transaction_type": transaction_type.value,
+            "price": price,
+        }
+
+        if best_before_date is not None:
+            data["best_before_date"] = best_before_date.strftime("%Y-%m-%d")
+
+        return await self._post(f"stock/products/{product_id}/add", data)
+
+    async def consume_product(
+        self,
+        product_id: int,
+        amount: float = 1,
+        spoiled: bool = False,
+        transaction_type: TransactionType = TransactionType.CONSUME,
+        allow_subproduct_substitution: bool = False,
+    ) -> Any:
+        """Consume an amount of a product from the stock."""
+        data = {
+            "amount": amount,
+            "spoiled": spoiled,
+            "transaction_type": transaction_type.value,
+            "allow_subproduct_substitution": allow_subproduct_substitution,
+        }
+
+        return await self._post(f"stock/products/{product_id}/consume", data)
+
+    async def open_product(
+        self,
+        product_id: int,
+        amount: float = 1,
+        allow_subproduct_substitution: bool = False,
+    ) -> Any:
+        """Mark an amount of a product as opened."""
+        data = {
+            "amount": amount,
+            "allow_subproduct_substitution": allow_subproduct_substitution,
+        }
+
+        return await self._post(f"stock/products/{product_id}/open", data)
+
+    async def execute_chore(
+        self,
+        chore_id: int,
+        done_by: int | None = None,
+        tracked_time: datetime | None = None,
+        skipped: bool = False,
+    ) -> Any:
+        """Track an execution of a chore."""
+        if tracked_time is None:
+            tracked_time = datetime.now()
+
+        data = {
+            "tracked_time": grocy_datetime_str(localize_datetime(tracked_time)),
+            "skipped": skipped,
+        }
+
+        if done_by is not None:
+            data["done_by"] = done_by
+
+        return await self._post(f"chores/{chore_id}/execute", data)
+
+    async def complete_task(
+        self, task_id: int, done_time: datetime | None = None
+    ) -> Any:
+        """Mark a task as completed."""
+        if done_time is None:
+            done_time = datetime.now()
+
+        data = {"done_time": grocy_datetime_str(localize_datetime(done_time))}
+        return await self._post(f"tasks/{task_id}/complete", data)
+
+    async def consume_recipe(self, recipe_id: int) -> Any:
+        """Consume all ingredients of a recipe."""
+        return await self._post(f"recipes/{recipe_id}/consume")
+
+    async def charge_battery(
+        self, battery_id: int, tracked_time: datetime | None = None
+    ) -> Any:
+        """Track a charge cycle of a battery."""
+        if tracked_time is None:
+            tracked_time = datetime.now()
+
+        data = {"tracked_time": grocy_datetime_str(localize_datetime(tracked_time))}
+        return await self._post(f"batteries/{battery_id}/charge", data)
+
+    async def add_missing_product_to_shopping_list(
+        self, shopping_list_id: int | None = None
+    ) -> Any:
+        """Add all products below their minimum stock amount to a shopping list."""
+        data = None
+        if shopping_list_id:
+            data = {"list_id": shopping_list_id}
+
+        return await self._post("stock/shoppinglist/add-missing-products", data)
+
+    async def remove_product_in_shopping_list(
+        self, product_id: int, shopping_list_id: int = 1, amount: float = 1
+    ) -> Any:
+        """Remove an amount of a product from a shopping list."""
+        data = {
+            "product_id": product_id,
+            "list_id": shopping_list_id,
+            "product_amount": amount,
+        }
+        return await self._post("stock/shoppinglist/remove-product", data)
+
+    async def add_generic(self, entity_type: EntityType, data: Any) -> Any:
+        """Add an object of the given entity type."""
+        return await self._post(f"objects/{entity_type.value}", data)
+
+    async def get_generic(self, entity_type: EntityType, object_id: int) -> Any:
+        """Return an object of the given entity type."""
+        return await self._get(f"objects/{entity_type.value}/{object_id}")
+
+    async def get_generic_objects_for_type(
+        self, entity_type: EntityType, query_filters: List[str] | None = None
+    ) -> Any:
+        """Return all objects of the given entity type."""
+        return await self._get(f"objects/{entity_type.value}", query_filters)
+
+    async def update_generic(
+        self, entity_type: EntityType, object_id: int, data: Any
+    ) -> Any:
+        """Update an object of the given entity type."""
+        return await self._request(
+            hdrs.METH_PUT, f"objects/{entity_type.value}/{object_id}", data=data
+        )
+
+    async def delete_generic(self, entity_type: EntityType, object_id: int) -> Any:
+        """Delete an object of the given entity type."""
+        return await self._request(
+            hdrs.METH_DELETE, f"objects/{entity_type.value}/{object_id}"
+        )
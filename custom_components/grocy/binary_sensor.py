@@ -22,10 +22,12 @@ from .const import (
     ATTR_OVERDUE_CHORES,
     ATTR_OVERDUE_PRODUCTS,
     ATTR_OVERDUE_TASKS,
+    CONF_RECORD_ATTRIBUTES,
     DOMAIN,
 )
 from .coordinator import GrocyDataUpdateCoordinator
 from .entity import GrocyEntity
+from .helpers import due_date_sort_key, products_summary
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,9 +40,14 @@ async def async_setup_entry(
     """Setup binary sensor platform."""
     coordinator: GrocyDataUpdateCoordinator = hass.data[DOMAIN]
     entities = []
+    entity_class = (
+        GrocyRecordedBinarySensorEntity
+        if config_entry.options.get(CONF_RECORD_ATTRIBUTES, False)
+        else GrocyBinarySensorEntity
+    )
     for description in BINARY_SENSORS:
         if description.exists_fn(coordinator.available_entities):
-            entity = GrocyBinarySensorEntity(coordinator, description, config_entry)
+            entity = entity_class(coordinator, description, config_entry)
             coordinator.entities.append(entity)
             entities.append(entity)
         else:
@@ -49,7 +56,7 @@ async def async_setup_entry(
                 description.key,
             )
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 @dataclass
@@ -57,6 +64,9 @@ class GrocyBinarySensorEntityDescription(BinarySensorEntityDescription):
     """Grocy binary sensor entity description."""
 
     attributes_fn: Callable[[List[Any]], Mapping[str, Any] | None] = lambda _: None
+    # Only descriptions with a sort key honour the attribute mode option.
+    sort_key: Callable[[Any], Any] | None = None
+    summary_fn: Callable[[List[Any]], Mapping[str, Any]] = lambda _: {}
     exists_fn: Callable[[List[str]], bool] = lambda _: True
     entity_registry_enabled_default: bool = False
 
@@ -71,6 +81,8 @@ BINARY_SENSORS: tuple[GrocyBinarySensorEntityDescription, ...] = (
             "expired_products": [x.as_dict() for x in data],
             "count": len(data),
         },
+        sort_key=due_date_sort_key,
+        summary_fn=products_summary,
     ),
     GrocyBinarySensorEntityDescription(
         key=ATTR_EXPIRING_PRODUCTS,
@@ -81,6 +93,8 @@ BINARY_SENSORS: tuple[GrocyBinarySensorEntityDescription, ...] = (
             "expiring_products": [x.as_dict() for x in data],
             "count": len(data),
         },
+        sort_key=due_date_sort_key,
+        summary_fn=products_summary,
     ),
     GrocyBinarySensorEntityDescription(
         key=ATTR_OVERDUE_PRODUCTS,
@@ -91,6 +105,8 @@ BINARY_SENSORS: tuple[GrocyBinarySensorEntityDescription, ...] = (
             "overdue_products": [x.as_dict() for x in data],
             "count": len(data),
         },
+        sort_key=due_date_sort_key,
+        summary_fn=products_summary,
     ),
     GrocyBinarySensorEntityDescription(
         key=ATTR_MISSING_PRODUCTS,
@@ -101,6 +117,10 @@ BINARY_SENSORS: tuple[GrocyBinarySensorEntityDescription, ...] = (
             "missing_products": [x.as_dict() for x in data],
             "count": len(data),
         },
+        sort_key=lambda product: -(product.amount_missing or 0),
+        summary_fn=lambda data: {
+            "amount_missing": sum(x.amount_missing or 0 for x in data),
+        },
     ),
     GrocyBinarySensorEntityDescription(
         key=ATTR_OVERDUE_CHORES,
@@ -144,3 +164,9 @@ class GrocyBinarySensorEntity(GrocyEntity, BinarySensorEntity):
         entity_data = self.coordinator.data.get(self.entity_description.key, None)
 
         return len(entity_data) > 0 if entity_data else False
+
+
+class GrocyRecordedBinarySensorEntity(GrocyBinarySensorEntity):
+    """Grocy binary sensor entity that also records its item lists."""
+
+    _unrecorded_attributes = frozenset()
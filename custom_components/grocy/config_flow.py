@@ -4,15 +4,38 @@ from collections import OrderedDict
 
 import voluptuous as vol
 from homeassistant import config_entries
-from pygrocy2.grocy import Grocy
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from .api import GrocyApi
 from .const import (
+    ATTRIBUTE_MODE_OPTIONS,
+    ATTRIBUTE_MODES,
     CONF_API_KEY,
+    CONF_ATTRIBUTE_LIMIT,
+    CONF_COMPRESS_RESPONSES,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_INCREMENTAL_STOCK_SYNC,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_PICTURE_CACHE_SIZE,
+    CONF_PICTURE_DISK_CACHE,
+    CONF_POOL_SIZE,
     CONF_PORT,
+    CONF_RECORD_ATTRIBUTES,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STOCK_ITEM_ENTITIES,
     CONF_URL,
     CONF_VERIFY_SSL,
+    DEFAULT_ATTRIBUTE_LIMIT,
+    DEFAULT_ATTRIBUTE_MODE,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_PICTURE_CACHE_SIZE,
+    DEFAULT_POOL_SIZE,
     DEFAULT_PORT,
+    DEFAULT_REFRESH_INTERVALS,
+    DEFAULT_REQUEST_TIMEOUT,
     DOMAIN,
+    MIN_REFRESH_INTERVAL,
     NAME,
 )
 from .helpers import extract_base_url_and_path
@@ -30,6 +53,12 @@ class GrocyFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize."""
         self._errors = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return GrocyOptionsFlowHandler(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
         self._errors = {}
@@ -79,18 +108,117 @@ class GrocyFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Return true if credentials is valid."""
         try:
             (base_url, path) = extract_base_url_and_path(url)
-            client = Grocy(
-                base_url, api_key, port=port, path=path, verify_ssl=verify_ssl
-            )
 
             _LOGGER.debug("Testing credentials")
 
-            def system_info():
-                """Get system information from Grocy."""
-                return client.get_system_info()
-
-            await self.hass.async_add_executor_job(system_info)
+            client = GrocyApi(
+                async_get_clientsession(self.hass, verify_ssl=verify_ssl),
+                base_url,
+                api_key,
+                port=port,
+                path=path,
+            )
+            await client.get_system_info()
             return True
         except Exception as error:  # pylint: disable=broad-except
             _LOGGER.error(error)
         return False
+
+
+class GrocyOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for Grocy."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the Grocy options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._config_entry.options
+        data_schema = OrderedDict()
+        data_schema[
+            vol.Optional(
+                CONF_MAX_CONCURRENT_REQUESTS,
+                default=options.get(
+                    CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                ),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=1, max=20))
+        data_schema[
+            vol.Optional(
+                CONF_POOL_SIZE,
+                default=options.get(CONF_POOL_SIZE, DEFAULT_POOL_SIZE),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=1, max=50))
+        data_schema[
+            vol.Optional(
+                CONF_REQUEST_TIMEOUT,
+                default=options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=1))
+        data_schema[
+            vol.Optional(
+                CONF_COMPRESS_RESPONSES,
+                default=options.get(CONF_COMPRESS_RESPONSES, True),
+            )
+        ] = bool
+        for option, default in DEFAULT_REFRESH_INTERVALS.items():
+            data_schema[
+                vol.Optional(option, default=options.get(option, default))
+            ] = vol.All(vol.Coerce(int), vol.Range(min=MIN_REFRESH_INTERVAL))
+        data_schema[
+            vol.Optional(
+                CONF_PICTURE_CACHE_SIZE,
+                default=options.get(CONF_PICTURE_CACHE_SIZE, DEFAULT_PICTURE_CACHE_SIZE),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        data_schema[
+            vol.Optional(
+                CONF_PICTURE_DISK_CACHE,
+                default=options.get(CONF_PICTURE_DISK_CACHE, False),
+            )
+        ] = bool
+        for option in ATTRIBUTE_MODE_OPTIONS.values():
+            data_schema[
+                vol.Optional(
+                    option, default=options.get(option, DEFAULT_ATTRIBUTE_MODE)
+                )
+            ] = vol.In(ATTRIBUTE_MODES)
+        data_schema[
+            vol.Optional(
+                CONF_ATTRIBUTE_LIMIT,
+                default=options.get(CONF_ATTRIBUTE_LIMIT, DEFAULT_ATTRIBUTE_LIMIT),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=1))
+        data_schema[
+            vol.Optional(
+                CONF_RECORD_ATTRIBUTES,
+                default=options.get(CONF_RECORD_ATTRIBUTES, False),
+            )
+        ] = bool
+        data_schema[
+            vol.Optional(
+                CONF_STOCK_ITEM_ENTITIES,
+                default=options.get(CONF_STOCK_ITEM_ENTITIES, False),
+            )
+        ] = bool
+        data_schema[
+            vol.Optional(
+                CONF_DIAGNOSTIC_SENSORS,
+                default=options.get(CONF_DIAGNOSTIC_SENSORS, False),
+            )
+        ] = bool
+        data_schema[
+            vol.Optional(
+                CONF_INCREMENTAL_STOCK_SYNC,
+                default=options.get(CONF_INCREMENTAL_STOCK_SYNC, False),
+            )
+        ] = bool
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(data_schema),
+        )
@@ -11,6 +11,13 @@ ISSUE_URL: Final = "https://github.com/custom-components/grocy/issues"
 PLATFORMS: Final = ["binary_sensor", "sensor"]
 
 SCAN_INTERVAL = timedelta(seconds=30)
+MIN_REFRESH_INTERVAL: Final = 10
+# Datasets such as overdue chores depend on the current time, so they are
+# refreshed at least this often even if Grocy's database did not change.
+UNCHANGED_REFRESH_INTERVAL = timedelta(minutes=5)
+# Datasets whose response did not change keep their records, but are rebuilt
+# at least this often to pick up changed details such as product names.
+DATASET_CACHE_MAX_AGE = timedelta(minutes=30)
 
 DEFAULT_PORT: Final = 9192
 CONF_URL: Final = "url"
@@ -18,6 +25,78 @@ CONF_PORT: Final = "port"
 CONF_API_KEY: Final = "api_key"
 CONF_VERIFY_SSL: Final = "verify_ssl"
 
+CONF_MAX_CONCURRENT_REQUESTS: Final = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS: Final = 6
+
+CONF_POOL_SIZE: Final = "pool_size"
+CONF_REQUEST_TIMEOUT: Final = "request_timeout"
+CONF_COMPRESS_RESPONSES: Final = "compress_responses"
+DEFAULT_POOL_SIZE: Final = 10
+# Request timeout in seconds.
+DEFAULT_REQUEST_TIMEOUT: Final = 30
+# Idle connections to Grocy are kept open for this many seconds, longer than
+# the shortest refresh interval so the polls reuse them.
+KEEPALIVE_TIMEOUT: Final = 60
+
+CONF_PICTURE_CACHE_SIZE: Final = "picture_cache_size"
+CONF_PICTURE_DISK_CACHE: Final = "picture_disk_cache"
+# Picture cache sizes in MB.
+DEFAULT_PICTURE_CACHE_SIZE: Final = 32
+PICTURE_DISK_CACHE_SIZE: Final = 256
+# Larger pictures are streamed to the client but not cached or shared between
+# concurrent requests.
+PICTURE_CACHE_MAX_ENTRY_SIZE: Final = 4
+PICTURE_CHUNK_SIZE: Final = 64 * 1024
+# Cached pictures are served without asking Grocy for this long, afterwards
+# they are revalidated with the ETag or Last-Modified header.
+PICTURE_CACHE_MAX_AGE = timedelta(hours=1)
+PICTURE_VIEW_DATA_KEY: Final = f"{DOMAIN}_picture_view"
+# Sent when the config entry is unloaded, ends the websocket subscriptions.
+SIGNAL_UNLOADED: Final = f"{DOMAIN}_unloaded"
+
+# The last data is stored at most this often and restored on startup.
+SNAPSHOT_STORAGE_VERSION: Final = 1
+SNAPSHOT_SAVE_DELAY: Final = 60
+
+CONF_ATTRIBUTE_LIMIT: Final = "attribute_limit"
+ATTRIBUTE_MODE_FULL: Final = "full"
+ATTRIBUTE_MODE_TOP: Final = "top"
+ATTRIBUTE_MODE_SUMMARY: Final = "summary"
+ATTRIBUTE_MODE_COUNT: Final = "count"
+ATTRIBUTE_MODES: Final = [
+    ATTRIBUTE_MODE_FULL,
+    ATTRIBUTE_MODE_TOP,
+    ATTRIBUTE_MODE_SUMMARY,
+    ATTRIBUTE_MODE_COUNT,
+]
+DEFAULT_ATTRIBUTE_MODE: Final = ATTRIBUTE_MODE_FULL
+DEFAULT_ATTRIBUTE_LIMIT: Final = 10
+CONF_RECORD_ATTRIBUTES: Final = "record_attributes"
+CONF_STOCK_ITEM_ENTITIES: Final = "stock_item_entities"
+CONF_DIAGNOSTIC_SENSORS: Final = "diagnostic_sensors"
+CONF_INCREMENTAL_STOCK_SYNC: Final = "incremental_stock_sync"
+# The incremental stock sync downloads the whole stock this often, and when
+# more stock log entries than this were added since the last sync.
+STOCK_FULL_SYNC_INTERVAL = timedelta(minutes=30)
+STOCK_SYNC_MAX_CHANGES: Final = 200
+
+CONF_STOCK_REFRESH_INTERVAL: Final = "stock_refresh_interval"
+CONF_SHOPPING_LIST_REFRESH_INTERVAL: Final = "shopping_list_refresh_interval"
+CONF_CHORES_REFRESH_INTERVAL: Final = "chores_refresh_interval"
+CONF_TASKS_REFRESH_INTERVAL: Final = "tasks_refresh_interval"
+CONF_MEAL_PLAN_REFRESH_INTERVAL: Final = "meal_plan_refresh_interval"
+CONF_BATTERIES_REFRESH_INTERVAL: Final = "batteries_refresh_interval"
+
+# Default refresh intervals in seconds.
+DEFAULT_REFRESH_INTERVALS: Final = {
+    CONF_STOCK_REFRESH_INTERVAL: 30,
+    CONF_SHOPPING_LIST_REFRESH_INTERVAL: 30,
+    CONF_CHORES_REFRESH_INTERVAL: 300,
+    CONF_TASKS_REFRESH_INTERVAL: 300,
+    CONF_MEAL_PLAN_REFRESH_INTERVAL: 3600,
+    CONF_BATTERIES_REFRESH_INTERVAL: 3600,
+}
+
 STARTUP_MESSAGE: Final = f"""
 -------------------------------------------------------------------
 {NAME}
@@ -47,3 +126,72 @@ ATTR_OVERDUE_TASKS: Final = "overdue_tasks"
 ATTR_SHOPPING_LIST: Final = "shopping_list"
 ATTR_STOCK: Final = "stock"
 ATTR_TASKS: Final = "tasks"
+
+DATASETS: Final = [
+    ATTR_BATTERIES,
+    ATTR_CHORES,
+    ATTR_EXPIRED_PRODUCTS,
+    ATTR_EXPIRING_PRODUCTS,
+    ATTR_MEAL_PLAN,
+    ATTR_MISSING_PRODUCTS,
+    ATTR_OVERDUE_BATTERIES,
+    ATTR_OVERDUE_CHORES,
+    ATTR_OVERDUE_PRODUCTS,
+    ATTR_OVERDUE_TASKS,
+    ATTR_SHOPPING_LIST,
+    ATTR_STOCK,
+    ATTR_TASKS,
+]
+
+# Datasets built from the stock snapshot.
+STOCK_DATASETS: Final = (
+    ATTR_STOCK,
+    ATTR_EXPIRING_PRODUCTS,
+    ATTR_EXPIRED_PRODUCTS,
+    ATTR_OVERDUE_PRODUCTS,
+    ATTR_MISSING_PRODUCTS,
+)
+
+# Refresh interval option of each dataset.
+DATASET_REFRESH_INTERVAL: Final = {
+    ATTR_STOCK: CONF_STOCK_REFRESH_INTERVAL,
+    ATTR_EXPIRING_PRODUCTS: CONF_STOCK_REFRESH_INTERVAL,
+    ATTR_EXPIRED_PRODUCTS: CONF_STOCK_REFRESH_INTERVAL,
+    ATTR_OVERDUE_PRODUCTS: CONF_STOCK_REFRESH_INTERVAL,
+    ATTR_MISSING_PRODUCTS: CONF_STOCK_REFRESH_INTERVAL,
+    ATTR_SHOPPING_LIST: CONF_SHOPPING_LIST_REFRESH_INTERVAL,
+    ATTR_CHORES: CONF_CHORES_REFRESH_INTERVAL,
+    ATTR_OVERDUE_CHORES: CONF_CHORES_REFRESH_INTERVAL,
+    ATTR_TASKS: CONF_TASKS_REFRESH_INTERVAL,
+    ATTR_OVERDUE_TASKS: CONF_TASKS_REFRESH_INTERVAL,
+    ATTR_MEAL_PLAN: CONF_MEAL_PLAN_REFRESH_INTERVAL,
+    ATTR_BATTERIES: CONF_BATTERIES_REFRESH_INTERVAL,
+    ATTR_OVERDUE_BATTERIES: CONF_BATTERIES_REFRESH_INTERVAL,
+}
+
+# Attribute mode option of each entity that lists products.
+ATTRIBUTE_MODE_OPTIONS: Final = {
+    ATTR_STOCK: "stock_attribute_mode",
+    ATTR_SHOPPING_LIST: "shopping_list_attribute_mode",
+    ATTR_EXPIRING_PRODUCTS: "expiring_products_attribute_mode",
+    ATTR_EXPIRED_PRODUCTS: "expired_products_attribute_mode",
+    ATTR_OVERDUE_PRODUCTS: "overdue_products_attribute_mode",
+    ATTR_MISSING_PRODUCTS: "missing_products_attribute_mode",
+}
+
+# Datasets with a lower priority are fetched first when requests are limited.
+DATASET_PRIORITY: Final = {
+    ATTR_STOCK: 0,
+    ATTR_SHOPPING_LIST: 0,
+    ATTR_EXPIRING_PRODUCTS: 1,
+    ATTR_EXPIRED_PRODUCTS: 1,
+    ATTR_OVERDUE_PRODUCTS: 1,
+    ATTR_MISSING_PRODUCTS: 1,
+    ATTR_CHORES: 2,
+    ATTR_OVERDUE_CHORES: 2,
+    ATTR_TASKS: 2,
+    ATTR_OVERDUE_TASKS: 2,
+    ATTR_MEAL_PLAN: 3,
+    ATTR_BATTERIES: 3,
+    ATTR_OVERDUE_BATTERIES: 3,
+}
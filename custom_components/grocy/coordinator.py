@@ -1,24 +1,45 @@
 """Data update coordinator for Grocy."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict, List
+from datetime import datetime, timedelta
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Set
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from pygrocy2.grocy import Grocy
 
+from .api import GrocyApi
 from .const import (
+    ATTR_STOCK,
     CONF_API_KEY,
+    CONF_COMPRESS_RESPONSES,
+    CONF_INCREMENTAL_STOCK_SYNC,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_POOL_SIZE,
     CONF_PORT,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STOCK_ITEM_ENTITIES,
     CONF_URL,
     CONF_VERIFY_SSL,
+    DATASET_PRIORITY,
+    DATASET_REFRESH_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_REFRESH_INTERVALS,
+    DEFAULT_REQUEST_TIMEOUT,
     DOMAIN,
     SCAN_INTERVAL,
+    UNCHANGED_REFRESH_INTERVAL,
 )
 from .grocy_data import GrocyData
 from .helpers import extract_base_url_and_path
+from .metrics import GrocyMetrics
+from .snapshot import GrocySnapshot, GrocySnapshotStore
+from .transport import async_create_session
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,30 +66,286 @@ class GrocyDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
 
         (base_url, path) = extract_base_url_and_path(url)
 
-        self.grocy_api = Grocy(
-            base_url, api_key, path=path, port=port, verify_ssl=verify_ssl
+        self.max_concurrent_requests: int = self.config_entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        options = self.config_entry.options
+        request_timeout = options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT)
+        # Closed on shutdown, when the config entry is unloaded, or when Home
+        # Assistant stops.
+        self.session = async_create_session(
+            verify_ssl,
+            options.get(CONF_POOL_SIZE, DEFAULT_POOL_SIZE),
+            request_timeout,
+            options.get(CONF_COMPRESS_RESPONSES, True),
+        )
+        self.config_entry.async_on_unload(
+            hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_CLOSE, self._async_close_session
+            )
+        )
+        self.metrics = GrocyMetrics()
+        self.grocy_api = GrocyApi(
+            self.session,
+            base_url,
+            api_key,
+            path=path,
+            port=port,
+            max_concurrent_requests=self.max_concurrent_requests,
+            metrics=self.metrics,
+            request_timeout=request_timeout,
+        )
+        self.grocy_data = GrocyData(
+            hass,
+            self.grocy_api,
+            self.metrics,
+            incremental_stock_sync=options.get(CONF_INCREMENTAL_STOCK_SYNC, False),
+        )
+        self.snapshot_store = GrocySnapshotStore(hass, self.config_entry.entry_id)
+        self.refresh_intervals: Dict[str, int] = {
+            option: self.config_entry.options.get(option, default)
+            for option, default in DEFAULT_REFRESH_INTERVALS.items()
+        }
+        self.update_interval = min(
+            SCAN_INTERVAL, timedelta(seconds=min(self.refresh_intervals.values()))
         )
-        self.grocy_data = GrocyData(hass, self.grocy_api)
 
         self.available_entities: List[str] = []
         self.entities: List[Entity] = []
+        # Datasets fetched even without an enabled entity of their own.
+        self.required_datasets: Set[str] = set()
+        if self.config_entry.options.get(CONF_STOCK_ITEM_ENTITIES, False):
+            self.required_datasets.add(ATTR_STOCK)
+        # Datasets fetched on the first refresh, before the entities are set up
+        # and before the enabled Grocy features are known.
+        self.initial_datasets: Set[str] = set()
+        self._last_fetch: Dict[str, float] = {}
+        self._fetched_db_changed_time: Dict[str, datetime | None] = {}
+        self._changed_keys: Set[str] | None = None
+        self._notified_update_success = True
 
     async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data."""
-        data: dict[str, Any] = {}
+        """Fetch the datasets that are due for a refresh and record its metrics."""
+        self.metrics.start_refresh()
+        start = perf_counter()
+        changed_keys: Set[str] = set()
+        try:
+            data = await self._async_update_datasets(changed_keys)
+        finally:
+            self.metrics.finish_refresh(perf_counter() - start)
+
+        # Local changes may update the listeners while the datasets are being
+        # fetched, so the changed keys are only handed over once nothing is
+        # awaited anymore before the listeners are updated.
+        self._changed_keys = changed_keys
+        if changed_keys:
+            self.snapshot_store.async_delay_save(self._snapshot)
+        return data
+
+    async def _async_update_datasets(self, changed_keys: Set[str]) -> dict[str, Any]:
+        """Fetch the datasets that are due for a refresh.
+
+        The keys of the datasets, products and locations that changed are
+        added to changed_keys.
+        """
+        keys: List[str] = []
 
         for entity in self.entities:
             if not entity.enabled:
                 _LOGGER.debug("Entity %s is disabled.", entity.entity_id)
                 continue
 
-            try:
-                data[
-                    entity.entity_description.key
-                ] = await self.grocy_data.async_update_data(
-                    entity.entity_description.key
+            keys.append(entity.entity_description.key)
+
+        for key in self.required_datasets:
+            if key in self.available_entities and key not in keys:
+                keys.append(key)
+
+        for key in self.initial_datasets:
+            if key not in keys:
+                keys.append(key)
+
+        now = monotonic()
+        due_keys = [key for key in keys if self._is_due(key, now)]
+        if not due_keys:
+            return self.data or {}
+
+        db_changed_time = await self._async_get_db_changed_time()
+        due_keys = [
+            key for key in due_keys if self._has_changed(key, db_changed_time, now)
+        ]
+        if not due_keys:
+            _LOGGER.debug("Grocy database unchanged, keeping previous data")
+            return self.data or {}
+
+        due_keys.sort(key=lambda key: DATASET_PRIORITY.get(key, 0))
+        _LOGGER.debug("Refreshing datasets: %s", due_keys)
+
+        self.grocy_data.reset_product_snapshot()
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_requests))
+        failed_keys: Set[str] = set()
+
+        async def _async_fetch(key: str) -> Any:
+            async with semaphore:
+                start = perf_counter()
+                try:
+                    result = await self.grocy_data.async_update_data(key)
+                except Exception as error:  # pylint: disable=broad-except
+                    # The feature of an initial dataset may have been disabled
+                    # since the last run, it is left to the regular refreshes.
+                    if key not in self.initial_datasets:
+                        raise
+                    _LOGGER.debug("Could not fetch %s: %s", key, error)
+                    failed_keys.add(key)
+                    return None
+                self.metrics.record_fetch(
+                    key, perf_counter() - start, len(result) if result else 0
                 )
-            except Exception as error:  # pylint: disable=broad-except
-                raise UpdateFailed(f"Update failed: {error}") from error
+                return result
 
-        return data
+        try:
+            results = await asyncio.gather(*(_async_fetch(key) for key in due_keys))
+        except Exception as error:  # pylint: disable=broad-except
+            raise UpdateFailed(f"Update failed: {error}") from error
+
+        for key in due_keys:
+            if key not in failed_keys:
+                self._last_fetch[key] = now
+                self._fetched_db_changed_time[key] = db_changed_time
+
+        data = dict(self.data or {})
+        for key, result in zip(due_keys, results):
+            if key in failed_keys:
+                continue
+            # Unchanged responses return the records of the last fetch again.
+            if key in data and data[key] is result:
+                continue
+
+            changed_keys.add(key)
+            data[key] = result
+
+        if ATTR_STOCK in changed_keys:
+            changed_keys |= self.grocy_data.inventory.update(data[ATTR_STOCK])
+
+        return {key: data[key] for key in keys if key in data}
+
+    async def async_shutdown(self) -> None:
+        """Cancel the scheduled refreshes and close the connections to Grocy."""
+        await super().async_shutdown()
+        await self.session.close()
+
+    async def _async_close_session(self, _event: Event) -> None:
+        """Close the connections to Grocy when Home Assistant stops."""
+        await self.session.close()
+
+    async def async_restore_snapshot(self) -> bool:
+        """Restore the available entities and data of the last run.
+
+        Returns False if nothing was stored, then Grocy has to be asked.
+        """
+        snapshot = await self.snapshot_store.async_load()
+        if snapshot is None:
+            return False
+
+        self.available_entities = snapshot.available_entities
+        self.data = snapshot.data
+        if ATTR_STOCK in self.data:
+            self.grocy_data.inventory.update(self.data[ATTR_STOCK])
+        return True
+
+    def _snapshot(self) -> GrocySnapshot:
+        """Return the current available entities and data."""
+        return GrocySnapshot(self.available_entities, self.data or {})
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners of the datasets that changed.
+
+        All listeners are updated when the availability changed or when the
+        changed datasets are unknown.
+        """
+        changed_keys, self._changed_keys = self._changed_keys, None
+        if self.last_update_success != self._notified_update_success:
+            changed_keys = None
+        self._notified_update_success = self.last_update_success
+
+        for update_callback, context in list(self._listeners.values()):
+            if changed_keys is None or context is None or context in changed_keys:
+                update_callback()
+
+    async def async_refresh_datasets(self, keys: Iterable[str]) -> None:
+        """Request a refresh that fetches the given datasets regardless of schedule."""
+        for key in keys:
+            self._last_fetch.pop(key, None)
+
+        await self.async_request_refresh()
+
+    async def async_get_dataset(self, key: str) -> List[Any]:
+        """Return a dataset, fetching it if no enabled entity keeps it up to date."""
+        if self.data is not None and key in self.data:
+            return self.data[key] or []
+
+        self.grocy_data.reset_product_snapshot()
+        return await self.grocy_data.async_update_data(key) or []
+
+    def async_apply_local_change(
+        self,
+        key: str,
+        change: Callable[[Any], Any | None],
+        reconcile_keys: Iterable[str],
+    ) -> None:
+        """Patch a dataset with a known change and reconcile it in the background.
+
+        The change receives the current dataset and returns the patched one, or
+        None if it cannot be applied locally. Entities are updated right away;
+        the reconciliation refresh corrects anything the patch got wrong.
+        """
+        if self.data is not None and key in self.data:
+            patched = change(self.data[key])
+            if patched is not None:
+                self._changed_keys = {key}
+                if key == ATTR_STOCK:
+                    self._changed_keys |= self.grocy_data.inventory.update(patched)
+                self.async_set_updated_data({**self.data, key: patched})
+
+        self.hass.async_create_task(self.async_refresh_datasets(reconcile_keys))
+
+    def _refresh_interval(self, key: str) -> float:
+        """Return the refresh interval of a dataset in seconds."""
+        option = DATASET_REFRESH_INTERVAL.get(key)
+        if option is None:
+            return SCAN_INTERVAL.total_seconds()
+        return self.refresh_intervals[option]
+
+    def _is_due(self, key: str, now: float) -> bool:
+        """Return True if the refresh interval of a dataset has elapsed."""
+        if self.data is None or key not in self.data or key not in self._last_fetch:
+            return True
+
+        return now - self._last_fetch[key] >= self._refresh_interval(key)
+
+    def _has_changed(
+        self, key: str, db_changed_time: datetime | None, now: float
+    ) -> bool:
+        """Return True if a due dataset may have changed since it was fetched."""
+        if (
+            db_changed_time is None
+            or self.data is None
+            or key not in self.data
+            or key not in self._last_fetch
+        ):
+            return True
+
+        return (
+            db_changed_time != self._fetched_db_changed_time.get(key)
+            or now - self._last_fetch[key]
+            >= UNCHANGED_REFRESH_INTERVAL.total_seconds()
+        )
+
+    async def _async_get_db_changed_time(self) -> datetime | None:
+        """Return the last database change time, or None if it is unavailable."""
+        try:
+            return await self.grocy_api.get_last_db_changed()
+        except Exception as error:  # pylint: disable=broad-except
+            _LOGGER.debug("Could not get the database changed time: %s", error)
+            return None
@@ -0,0 +1,44 @@
+"""Diagnostics support for Grocy."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, CONF_URL, DOMAIN
+from .coordinator import GrocyDataUpdateCoordinator
+
+TO_REDACT = {CONF_API_KEY, CONF_URL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics with the timing and payload metrics of a config entry."""
+    coordinator: GrocyDataUpdateCoordinator = hass.data[DOMAIN]
+
+    return {
+        "config_entry": {
+            "data": async_redact_data(config_entry.data, TO_REDACT),
+            "options": dict(config_entry.options),
+        },
+        "available_entities": coordinator.available_entities,
+        "enabled_datasets": sorted(
+            {
+                entity.entity_description.key
+                for entity in coordinator.entities
+                if entity.enabled
+            }
+        ),
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": coordinator.update_interval.total_seconds()
+        if coordinator.update_interval
+        else None,
+        "item_counts": {
+            key: len(value) if value is not None else None
+            for key, value in (coordinator.data or {}).items()
+        },
+        "metrics": coordinator.metrics.as_dict(),
+    }
@@ -1,8 +1,10 @@
 """Entity for Grocy."""
 from __future__ import annotations
 
+import heapq
 import json
 from collections.abc import Mapping
+from time import perf_counter
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
@@ -10,14 +12,46 @@ from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo, EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, NAME, VERSION
+from .const import (
+    ATTRIBUTE_MODE_COUNT,
+    ATTRIBUTE_MODE_FULL,
+    ATTRIBUTE_MODE_OPTIONS,
+    ATTRIBUTE_MODE_SUMMARY,
+    CONF_ATTRIBUTE_LIMIT,
+    DEFAULT_ATTRIBUTE_LIMIT,
+    DEFAULT_ATTRIBUTE_MODE,
+    DOMAIN,
+    NAME,
+    VERSION,
+)
 from .coordinator import GrocyDataUpdateCoordinator
 from .json_encoder import CustomJSONEncoder
 
+# Item lists are left out of the recorder unless recording them is enabled,
+# only their count and summary end up in the history.
+LIST_ATTRIBUTES = frozenset(
+    {
+        "batteries",
+        "chores",
+        "expired_products",
+        "expiring_products",
+        "meals",
+        "missing_products",
+        "overdue_batteries",
+        "overdue_chores",
+        "overdue_products",
+        "overdue_tasks",
+        "products",
+        "tasks",
+    }
+)
+
 
 class GrocyEntity(CoordinatorEntity[GrocyDataUpdateCoordinator]):
     """Grocy base entity definition."""
 
+    _unrecorded_attributes = LIST_ATTRIBUTES
+
     def __init__(
         self,
         coordinator: GrocyDataUpdateCoordinator,
@@ -25,10 +59,18 @@ class GrocyEntity(CoordinatorEntity[GrocyDataUpdateCoordinator]):
         config_entry: ConfigEntry,
     ) -> None:
         """Initialize entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=description.key)
         self._attr_name = description.name
         self._attr_unique_id = f"{config_entry.entry_id}{description.key.lower()}"
         self.entity_description = description
+        self._attributes_data: Any = None
+        self._attributes: Mapping[str, Any] | None = None
+        self._attribute_mode: str = config_entry.options.get(
+            ATTRIBUTE_MODE_OPTIONS.get(description.key), DEFAULT_ATTRIBUTE_MODE
+        )
+        self._attribute_limit: int = config_entry.options.get(
+            CONF_ATTRIBUTE_LIMIT, DEFAULT_ATTRIBUTE_LIMIT
+        )
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -43,14 +85,47 @@ class GrocyEntity(CoordinatorEntity[GrocyDataUpdateCoordinator]):
 
     @property
     def extra_state_attributes(self) -> Mapping[str, Any] | None:
-        """Return the extra state attributes."""
+        """Return the extra state attributes.
+
+        The serialized attributes are cached until the coordinator replaces
+        the dataset of this entity, which only happens when it was fetched again.
+        """
         data = self.coordinator.data.get(self.entity_description.key)
+        if data is not self._attributes_data:
+            self._attributes_data = data
+            self._attributes = self._build_attributes(data)
+
+        return self._attributes
+
+    def _build_attributes(self, data: Any) -> Mapping[str, Any] | None:
+        """Serialize the attributes of a dataset."""
         if data and hasattr(self.entity_description, "attributes_fn"):
-            return json.loads(
-                json.dumps(
-                    self.entity_description.attributes_fn(data),
-                    cls=CustomJSONEncoder,
-                )
+            start = perf_counter()
+            attributes = json.loads(
+                json.dumps(self._list_attributes(data), cls=CustomJSONEncoder)
             )
+            self.coordinator.metrics.record_serialization(
+                self.entity_description.key, perf_counter() - start
+            )
+            return attributes
 
         return None
+
+    def _list_attributes(self, data: Any) -> Mapping[str, Any] | None:
+        """Return the attributes of a dataset in the configured attribute mode.
+
+        Descriptions without a sort key always expose the full list.
+        """
+        description = self.entity_description
+        sort_key = getattr(description, "sort_key", None)
+        if sort_key is None or self._attribute_mode == ATTRIBUTE_MODE_FULL:
+            return description.attributes_fn(data)
+
+        if self._attribute_mode == ATTRIBUTE_MODE_COUNT:
+            return {"count": len(data)}
+
+        if self._attribute_mode == ATTRIBUTE_MODE_SUMMARY:
+            return {**description.summary_fn(data), "count": len(data)}
+
+        top = heapq.nsmallest(self._attribute_limit, data, key=sort_key)
+        return {**description.attributes_fn(top), "count": len(data)}
@@ -1,17 +1,37 @@
 """Communication with Grocy API."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import List
+from functools import partial
+from http import HTTPStatus
+from time import monotonic, perf_counter, time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Tuple,
+    TypeVar,
+)
 
-from aiohttp import hdrs, web
+from aiohttp import ClientSession, hdrs, web
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from pygrocy2.data_models.battery import Battery
+from homeassistant.core import HomeAssistant, callback
+from pygrocy2.data_models.product import Product
+from pygrocy2.data_models.generic import EntityType
+from pygrocy2.grocy_api_client import (
+    CurrentVolatilStockResponse,
+    ProductData,
+    ProductDetailsResponse,
+)
 
+from .api import GrocyApi, GrocyNotModified, PrefetchedDetails, ResponseValidators
 from .const import (
     ATTR_BATTERIES,
     ATTR_CHORES,
@@ -27,21 +47,136 @@ from .const import (
     ATTR_STOCK,
     ATTR_TASKS,
     CONF_API_KEY,
+    CONF_PICTURE_CACHE_SIZE,
+    CONF_PICTURE_DISK_CACHE,
     CONF_PORT,
     CONF_URL,
+    DATASET_CACHE_MAX_AGE,
+    DEFAULT_PICTURE_CACHE_SIZE,
+    DOMAIN,
+    PICTURE_CACHE_MAX_AGE,
+    PICTURE_CACHE_MAX_ENTRY_SIZE,
+    PICTURE_CHUNK_SIZE,
+    PICTURE_DISK_CACHE_SIZE,
+    PICTURE_VIEW_DATA_KEY,
+)
+from .helpers import (
+    BatteryRecord,
+    ChoreRecord,
+    MealPlanRecord,
+    ProductRecord,
+    ShoppingListRecord,
+    TaskRecord,
+    VolatileProductRecord,
+    extract_base_url_and_path,
 )
-from .helpers import ProductWrapper, MealPlanItemWrapper, extract_base_url_and_path
+from .inventory import InventoryStore
+from .metrics import GrocyMetrics
+from .picture_cache import CachedPicture, GrocyPictureCache, PictureKey
+from .stock_sync import StockJournalSync
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+
+class ProductSnapshot:
+    """Stock and volatile stock of one refresh, shared by all product datasets."""
+
+    def __init__(
+        self,
+        api: GrocyApi,
+        load_stock: Callable[[], Awaitable[List[ProductRecord]]],
+        load_volatile_stock: Callable[[], Awaitable[CurrentVolatilStockResponse]],
+    ):
+        """Initialize an empty product snapshot."""
+        self._api = api
+        self._load_stock = load_stock
+        self._load_volatile_stock = load_volatile_stock
+        self._stock: asyncio.Future[List[ProductRecord]] | None = None
+        self._volatile_stock: asyncio.Future[CurrentVolatilStockResponse] | None = None
+        self._details: PrefetchedDetails | None = None
+
+    async def async_get_stock(self) -> List[ProductRecord]:
+        """Return the current stock, loading it on first use."""
+        if self._stock is None:
+            self._stock = asyncio.ensure_future(self._load_stock())
+        return await self._stock
+
+    async def async_get_volatile_stock(self) -> CurrentVolatilStockResponse:
+        """Return the volatile stock, fetching it on first use."""
+        if self._volatile_stock is None:
+            self._volatile_stock = asyncio.ensure_future(self._load_volatile_stock())
+        return await self._volatile_stock
+
+    async def async_get_details(self, product_ids: Iterable[int]) -> PrefetchedDetails:
+        """Return details of the given products.
+
+        Details of products in stock are derived from the current stock; the
+        others, such as missing products, are fetched from Grocy.
+        """
+        stock = await self.async_get_stock()
+        if self._details is None:
+            details = PrefetchedDetails()
+            for item in stock:
+                details.products[item.id] = ProductDetailsResponse.model_construct(
+                    stock_amount=item.available_amount,
+                    product=ProductData.model_construct(
+                        id=item.id,
+                        name=item.name,
+                        product_group_id=item.product_group_id,
+                    ),
+                    barcodes=[],
+                )
+            self._details = details
+
+        unknown_ids = set(product_ids) - self._details.products.keys()
+        if unknown_ids:
+            self._details.products.update(await self._api.get_products(unknown_ids))
+        return self._details
+
+
+class CachedDataset(Generic[_T]):
+    """Records of a list dataset with the validators of its response."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cached dataset."""
+        self.validators = ResponseValidators()
+        self.records: List[_T] = []
+        self.built = monotonic()
+
 
 class GrocyData:
     """Handles communication and gets the data."""
 
-    def __init__(self, hass, api):
+    def __init__(
+        self,
+        hass,
+        api: GrocyApi,
+        metrics: GrocyMetrics | None = None,
+        incremental_stock_sync: bool = False,
+    ):
         """Initialize Grocy data."""
         self.hass = hass
         self.api = api
+        self.metrics = metrics
+        self.stock_sync: StockJournalSync | None = None
+        if incremental_stock_sync:
+            self.stock_sync = StockJournalSync(
+                api, partial(self._build, ATTR_STOCK, ProductRecord.from_stock)
+            )
+        self.product_snapshot = ProductSnapshot(
+            api, self._async_load_stock, self._async_load_volatile_stock
+        )
+        self.inventory = InventoryStore()
+        self._datasets: Dict[str, CachedDataset] = {}
+        self._volatile_validators = ResponseValidators()
+        self._volatile_stock: CurrentVolatilStockResponse | None = None
+        # Records of each volatile product dataset, with the volatile stock
+        # and stock they were built from.
+        self._volatile_records: Dict[
+            str, Tuple[Any, List[ProductRecord], List[VolatileProductRecord]]
+        ] = {}
         self.entity_update_method = {
             ATTR_STOCK: self.async_update_stock,
             ATTR_CHORES: self.async_update_chores,
@@ -63,44 +198,141 @@ class GrocyData:
         if entity_key in self.entity_update_method:
             return await self.entity_update_method[entity_key]()
 
+    async def async_get_product_by_barcode(self, barcode: str) -> ProductRecord | None:
+        """Return the product in stock with a barcode, loading the barcodes if needed."""
+        if self.inventory.barcodes is None:
+            self.inventory.set_barcodes(
+                await self.api.get_generic_objects_for_type(EntityType.PRODUCT_BARCODES)
+                or []
+            )
+        return self.inventory.product_by_barcode(barcode)
+
+    def reset_product_snapshot(self) -> None:
+        """Start a new product snapshot for the next refresh."""
+        self.product_snapshot = ProductSnapshot(
+            self.api, self._async_load_stock, self._async_load_volatile_stock
+        )
+
+    async def _async_load_stock(self) -> List[ProductRecord]:
+        """Return the current stock, synced from the stock log if enabled."""
+        if self.stock_sync is not None:
+            return await self.stock_sync.async_sync()
+        return await self._async_update_list(
+            ATTR_STOCK, self.api.get_stock, ProductRecord.from_stock
+        )
+
+    async def _async_load_volatile_stock(self) -> CurrentVolatilStockResponse:
+        """Return the volatile stock, the same response if it did not change."""
+        try:
+            self._volatile_stock = await self.api.get_volatile_stock(
+                validators=self._volatile_validators
+            )
+        except GrocyNotModified:
+            pass
+        except BaseException:
+            # The validators may already belong to the failed response.
+            self._volatile_validators = ResponseValidators()
+            raise
+        return self._volatile_stock
+
+    def _build(
+        self, key: str, build: Callable[[Any], _T], items: Iterable[Any]
+    ) -> List[_T]:
+        """Wrap the items of a dataset, recording the time it takes."""
+        start = perf_counter()
+        records = [build(item) for item in items]
+        if self.metrics is not None:
+            self.metrics.record_build(key, perf_counter() - start)
+        return records
+
+    async def _async_update_list(
+        self,
+        key: str,
+        fetch: Callable[..., Awaitable[Iterable[Any]]],
+        build: Callable[[Any], _T],
+        sort_key: Callable[[_T], Any] | None = None,
+    ) -> List[_T]:
+        """Fetch and wrap a list dataset.
+
+        If Grocy's response did not change since the last fetch, the records
+        built from it are returned again without fetching any details.
+        """
+        cached = self._datasets.get(key)
+        if (
+            cached is None
+            or monotonic() - cached.built >= DATASET_CACHE_MAX_AGE.total_seconds()
+        ):
+            cached = self._datasets[key] = CachedDataset()
+
+        try:
+            items = await fetch(validators=cached.validators)
+        except GrocyNotModified:
+            return cached.records
+        except BaseException:
+            # The validators may already belong to the failed response.
+            self._datasets.pop(key, None)
+            raise
+
+        records = self._build(key, build, items)
+        if sort_key is not None:
+            records.sort(key=sort_key)
+        cached.records = records
+        cached.built = monotonic()
+        return records
+
     async def async_update_stock(self):
         """Update stock data."""
-
-        def wrapper():
-            return [ProductWrapper(item, self.hass) for item in self.api._api_client.get_stock()]
-        
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self.product_snapshot.async_get_stock()
+
+    async def _async_update_volatile_products(
+        self, key: str, attribute: str
+    ) -> List[VolatileProductRecord]:
+        """Build a volatile product dataset from the product snapshot."""
+        snapshot = self.product_snapshot
+        volatile_stock, stock = await asyncio.gather(
+            snapshot.async_get_volatile_stock(), snapshot.async_get_stock()
+        )
+        cached = self._volatile_records.get(key)
+        if cached is not None and cached[0] is volatile_stock and cached[1] is stock:
+            return cached[2]
+
+        products = [Product(item) for item in getattr(volatile_stock, attribute) or []]
+        details = await snapshot.async_get_details(product.id for product in products)
+
+        def _product(product: Product) -> VolatileProductRecord:
+            product.get_details(details)
+            return VolatileProductRecord.from_model(product)
+
+        records = self._build(key, _product, products)
+        self._volatile_records[key] = (volatile_stock, stock, records)
+        return records
 
     async def async_update_chores(self):
         """Update chores data."""
-
-        def wrapper():
-            return self.api.chores(True)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_list(
+            ATTR_CHORES, partial(self.api.chores, True), ChoreRecord.from_model
+        )
 
     async def async_update_overdue_chores(self):
         """Update overdue chores data."""
 
         query_filter = [f"next_estimated_execution_time<{datetime.now()}"]
 
-        def wrapper():
-            return self.api.chores(get_details=True, query_filters=query_filter)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_list(
+            ATTR_OVERDUE_CHORES,
+            partial(self.api.chores, get_details=True, query_filters=query_filter),
+            ChoreRecord.from_model,
+        )
 
     async def async_get_config(self):
         """Get the configuration from Grocy."""
-
-        def wrapper():
-            return self.api.get_system_config()
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self.api.get_system_config()
 
     async def async_update_tasks(self):
         """Update tasks data."""
-
-        return await self.hass.async_add_executor_job(self.api.tasks)
+        return await self._async_update_list(
+            ATTR_TASKS, self.api.tasks, TaskRecord.from_model
+        )
 
     async def async_update_overdue_tasks(self):
         """Update overdue tasks data."""
@@ -111,50 +343,43 @@ class GrocyData:
             r"due_date§.*\S.*",
         ]
 
-        def wrapper():
-            return self.api.tasks(query_filters=and_query_filter)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_list(
+            ATTR_OVERDUE_TASKS,
+            partial(self.api.tasks, query_filters=and_query_filter),
+            TaskRecord.from_model,
+        )
 
     async def async_update_shopping_list(self):
         """Update shopping list data."""
-
-        def wrapper():
-            return self.api.shopping_list(True)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_list(
+            ATTR_SHOPPING_LIST,
+            partial(self.api.shopping_list, True),
+            ShoppingListRecord.from_model,
+        )
 
     async def async_update_expiring_products(self):
         """Update expiring products data."""
-
-        def wrapper():
-            return self.api.due_products(True)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_volatile_products(
+            ATTR_EXPIRING_PRODUCTS, "due_products"
+        )
 
     async def async_update_expired_products(self):
         """Update expired products data."""
-
-        def wrapper():
-            return self.api.expired_products(True)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_volatile_products(
+            ATTR_EXPIRED_PRODUCTS, "expired_products"
+        )
 
     async def async_update_overdue_products(self):
         """Update overdue products data."""
-
-        def wrapper():
-            return self.api.overdue_products(True)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_volatile_products(
+            ATTR_OVERDUE_PRODUCTS, "overdue_products"
+        )
 
     async def async_update_missing_products(self):
         """Update missing products data."""
-
-        def wrapper():
-            return self.api.missing_products(True)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_volatile_products(
+            ATTR_MISSING_PRODUCTS, "missing_products"
+        )
 
     async def async_update_meal_plan(self):
         """Update meal plan data."""
@@ -163,48 +388,129 @@ class GrocyData:
         yesterday = datetime.now() - timedelta(1)
         query_filter = [f"day>{yesterday.date()}"]
 
-        def wrapper():
-            meal_plan = self.api.meal_plan(get_details=True, query_filters=query_filter)
-            plan = [MealPlanItemWrapper(item) for item in meal_plan]
-            return sorted(plan, key=lambda item: item.meal_plan.day)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        return await self._async_update_list(
+            ATTR_MEAL_PLAN,
+            partial(self.api.meal_plan, get_details=True, query_filters=query_filter),
+            MealPlanRecord.from_meal_plan,
+            sort_key=lambda item: item.day,
+        )
 
-    async def async_update_batteries(self) -> List[Battery]:
+    async def async_update_batteries(self) -> List[BatteryRecord]:
         """Update batteries."""
+        return await self._async_update_list(
+            ATTR_BATTERIES,
+            partial(self.api.batteries, get_details=True),
+            BatteryRecord.from_model,
+        )
 
-        def wrapper():
-            return self.api.batteries(get_details=True)
-
-        return await self.hass.async_add_executor_job(wrapper)
-
-    async def async_update_overdue_batteries(self) -> List[Battery]:
+    async def async_update_overdue_batteries(self) -> List[BatteryRecord]:
         """Update overdue batteries."""
-
-        def wrapper():
-            filter_query = [f"next_estimated_charge_time<{datetime.now()}"]
-            return self.api.batteries(filter_query, get_details=True)
-
-        return await self.hass.async_add_executor_job(wrapper)
+        filter_query = [f"next_estimated_charge_time<{datetime.now()}"]
+        return await self._async_update_list(
+            ATTR_OVERDUE_BATTERIES,
+            partial(self.api.batteries, filter_query, get_details=True),
+            BatteryRecord.from_model,
+        )
+
+
+def apply_stock_change(
+    stock: List[ProductRecord], product_id: int, amount: float = 0, opened: float = 0
+) -> List[ProductRecord] | None:
+    """Return the stock with a product's amounts changed, or None if it is not in stock."""
+    return apply_stock_changes(stock, {product_id: (amount, opened)})
+
+
+def apply_stock_changes(
+    stock: List[ProductRecord], changes: Dict[int, Tuple[float, float]]
+) -> List[ProductRecord] | None:
+    """Return the stock with the amount and opened changes of many products applied.
+
+    Returns None if any of the products is not in stock.
+    """
+    patched = []
+    found = set()
+    for item in stock:
+        if item.id not in changes:
+            patched.append(item)
+            continue
+
+        found.add(item.id)
+        item = item.with_stock_change(*changes[item.id])
+        if item.available_amount > 0:
+            patched.append(item)
+
+    return patched if len(found) == len(changes) else None
+
+
+def apply_shopping_list_removal(
+    shopping_list: List[ShoppingListRecord], product_id: int, amount: float
+) -> List[ShoppingListRecord] | None:
+    """Return the shopping list with an amount of a product removed.
+
+    Items do not know which list they belong to, so only a product that is on
+    exactly one list can be patched locally.
+    """
+    matches = [item for item in shopping_list if item.product_id == product_id]
+    if len(matches) != 1:
+        return None
+
+    patched = []
+    for item in shopping_list:
+        if item is matches[0]:
+            remaining = (item.amount or 0) - amount
+            if remaining <= 0:
+                continue
+            item = item.replace(amount=remaining)
+        patched.append(item)
+
+    return patched
 
 
 async def async_setup_endpoint_for_image_proxy(
-    hass: HomeAssistant, config_entry: ConfigEntry
+    hass: HomeAssistant, config_entry: ConfigEntry, session: ClientSession
 ):
     """Setup and register the image api for grocy images with HA."""
-    session = async_get_clientsession(hass)
-
-    url = config_entry.get(CONF_URL)
+    url = config_entry.data.get(CONF_URL)
     (grocy_base_url, grocy_path) = extract_base_url_and_path(url)
-    api_key = config_entry.get(CONF_API_KEY)
-    port_number = config_entry.get(CONF_PORT)
+    api_key = config_entry.data.get(CONF_API_KEY)
+    port_number = config_entry.data.get(CONF_PORT)
     if grocy_path:
         grocy_full_url = f"{grocy_base_url}:{port_number}/{grocy_path}"
     else:
         grocy_full_url = f"{grocy_base_url}:{port_number}"
 
+    cache = None
+    cache_size = config_entry.options.get(
+        CONF_PICTURE_CACHE_SIZE, DEFAULT_PICTURE_CACHE_SIZE
+    )
+    if cache_size > 0:
+        disk_path = None
+        if config_entry.options.get(CONF_PICTURE_DISK_CACHE, False):
+            disk_path = hass.config.path(".cache", DOMAIN, "pictures")
+        cache = GrocyPictureCache(
+            hass,
+            cache_size * 1024 * 1024,
+            PICTURE_CACHE_MAX_ENTRY_SIZE * 1024 * 1024,
+            disk_path,
+            PICTURE_DISK_CACHE_SIZE * 1024 * 1024,
+        )
+
     _LOGGER.debug("Generated image api url to grocy: '%s'", grocy_full_url)
-    hass.http.register_view(GrocyPictureView(session, grocy_full_url, api_key))
+    # Views can't be removed, so a reloaded entry reconfigures the registered one.
+    if (view := hass.data.get(PICTURE_VIEW_DATA_KEY)) is not None:
+        view.configure(session, grocy_full_url, api_key, cache)
+        return
+
+    view = GrocyPictureView(session, grocy_full_url, api_key, cache)
+    hass.http.register_view(view)
+    hass.data[PICTURE_VIEW_DATA_KEY] = view
+
+
+@callback
+def async_unload_endpoint_for_image_proxy(hass: HomeAssistant) -> None:
+    """Stop serving Grocy pictures; views can't be removed, so the view is reset."""
+    if (view := hass.data.get(PICTURE_VIEW_DATA_KEY)) is not None:
+        view.reset()
 
 
 class GrocyPictureView(HomeAssistantView):
@@ -214,19 +520,102 @@ class GrocyPictureView(HomeAssistantView):
     url = "/api/grocy/{picture_type}/{filename}"
     name = "api:grocy:picture"
 
-    def __init__(self, session, base_url, api_key):
+    def __init__(self, session, base_url, api_key, cache=None):
+        self._max_shared_size = PICTURE_CACHE_MAX_ENTRY_SIZE * 1024 * 1024
+        self._inflight: Dict[PictureKey, asyncio.Future[CachedPicture | None]] = {}
+        self.configure(session, base_url, api_key, cache)
+
+    def configure(self, session, base_url, api_key, cache=None) -> None:
+        """Set the Grocy instance and cache to serve the pictures from."""
         self._session = session
         self._base_url = base_url
         self._api_key = api_key
+        self._cache: GrocyPictureCache | None = cache
 
-    async def get(self, request, picture_type: str, filename: str) -> web.Response:
+    def reset(self) -> None:
+        """Forget the Grocy instance, its session is closed when the entry unloads."""
+        self._session: ClientSession | None = None
+        self._cache = None
+
+    async def get(
+        self, request, picture_type: str, filename: str
+    ) -> web.StreamResponse:
         """GET request for the image."""
-        width = request.query.get("width", 400)
+        if self._session is None or self._session.closed:
+            return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE)
+
+        width = int(request.query.get("width", 400))
+        key = (picture_type, filename, width)
+
+        # Concurrent requests for the same picture wait for a single upstream
+        # fetch. If its result can't be shared, the next waiter fetches it.
+        while True:
+            cached = None
+            if self._cache is not None:
+                cached = await self._cache.async_get(key)
+                if cached is not None and cached.is_fresh(
+                    PICTURE_CACHE_MAX_AGE.total_seconds()
+                ):
+                    return web.Response(body=cached.body, headers=cached.headers)
+
+            if (inflight := self._inflight.get(key)) is None:
+                break
+
+            if (picture := await asyncio.shield(inflight)) is not None:
+                return web.Response(body=picture.body, headers=picture.headers)
+
+        future: asyncio.Future[CachedPicture | None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[key] = future
+        try:
+            return await self._async_fetch(request, key, cached, future)
+        finally:
+            self._share(key, future, None)
+
+    def _share(
+        self,
+        key: PictureKey,
+        future: asyncio.Future[CachedPicture | None],
+        picture: CachedPicture | None,
+    ) -> None:
+        """Hand a fetched picture to the waiters, None if they fetch it themselves."""
+        if future.done():
+            return
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        future.set_result(picture)
+
+    async def _async_fetch(
+        self,
+        request,
+        key: PictureKey,
+        cached: CachedPicture | None,
+        future: asyncio.Future[CachedPicture | None],
+    ) -> web.StreamResponse:
+        """Fetch a picture from Grocy and share it before sending it.
+
+        The waiters get the picture as soon as it is read from Grocy, so a slow
+        client doesn't hold them up. Pictures too large to share are streamed.
+        """
+        picture_type, filename, width = key
         url = f"{self._base_url}/api/files/{picture_type}/{filename}"
-        url = f"{url}?force_serve_as=picture&best_fit_width={int(width)}"
+        url = f"{url}?force_serve_as=picture&best_fit_width={width}"
         headers = {"GROCY-API-KEY": self._api_key, "accept": "*/*"}
 
+        if cached is not None:
+            if cached.etag:
+                headers[hdrs.IF_NONE_MATCH] = cached.etag
+            if cached.last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = cached.last_modified
+
         async with self._session.get(url, headers=headers) as resp:
+            if resp.status == 304 and cached is not None:
+                cached.validated = time()
+                await self._cache.async_set(key, cached)
+                self._share(key, future, cached)
+                return web.Response(body=cached.body, headers=cached.headers)
+
             resp.raise_for_status()
 
             response_headers = {}
@@ -240,5 +629,32 @@ class GrocyPictureView(HomeAssistantView):
                 ):
                     response_headers[name] = value
 
-            body = await resp.read()
-            return web.Response(body=body, headers=response_headers)
+            body = bytearray()
+            response: web.StreamResponse | None = None
+            async for chunk in resp.content.iter_chunked(PICTURE_CHUNK_SIZE):
+                if response is not None:
+                    await response.write(chunk)
+                    continue
+
+                body.extend(chunk)
+                if len(body) > self._max_shared_size:
+                    self._share(key, future, None)
+                    response = web.StreamResponse(headers=response_headers)
+                    await response.prepare(request)
+                    await response.write(bytes(body))
+
+            if response is not None:
+                await response.write_eof()
+                return response
+
+            picture = CachedPicture(
+                body=bytes(body),
+                headers=response_headers,
+                etag=resp.headers.get(hdrs.ETAG),
+                last_modified=resp.headers.get(hdrs.LAST_MODIFIED),
+            )
+            if self._cache is not None:
+                await self._cache.async_set(key, picture)
+            self._share(key, future, picture)
+
+        return web.Response(body=picture.body, headers=picture.headers)
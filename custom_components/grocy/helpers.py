@@ -3,13 +3,20 @@ from __future__ import annotations
 
 import json
 import base64
-from typing import Any, Dict, Tuple
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple, Type
 from urllib.parse import urlparse
 
+from pygrocy2.base import DataModel
+from pygrocy2.data_models.battery import Battery
+from pygrocy2.data_models.chore import Chore
 from pygrocy2.data_models.meal_items import MealPlanItem
-from pygrocy2.data_models.product import Product
+from pygrocy2.data_models.product import Product, ShoppingListProduct
+from pygrocy2.data_models.task import Task
 from pygrocy2.grocy_api_client import CurrentStockResponse
 
+from .json_encoder import CustomJSONEncoder
+
 
 def extract_base_url_and_path(url: str) -> Tuple[str, str]:
     """Extract the base url and path from a given URL."""
@@ -18,61 +25,197 @@ def extract_base_url_and_path(url: str) -> Tuple[str, str]:
     return (f"{parsed_url.scheme}://{parsed_url.netloc}", parsed_url.path.strip("/"))
 
 
-class MealPlanItemWrapper:
-    """Wrapper around the pygrocy MealPlanItem."""
+def serialize_items(items: List[Any]) -> List[Dict[str, Any]]:
+    """Return the JSON compatible dicts of dataset items."""
+    return json.loads(
+        json.dumps([item.as_dict() for item in items], cls=CustomJSONEncoder)
+    )
+
+
+def due_date_sort_key(product: Any) -> Tuple[bool, datetime]:
+    """Sort key for products by due date, products without one last."""
+    due_date = product.best_before_date
+    return (due_date is None, due_date or datetime.max)
+
+
+def shopping_list_sort_key(item: Any) -> Tuple[str, int]:
+    """Sort key for shopping list items by product name, then by order added."""
+    name = (item.product or {}).get("name") or item.note or ""
+    return (name.casefold(), item.id)
+
+
+def products_summary(products: List[Any]) -> Dict[str, Any]:
+    """Summarize a list of products by the one that is due next."""
+    next_due = min(
+        (product for product in products if product.best_before_date is not None),
+        key=due_date_sort_key,
+        default=None,
+    )
+    return {
+        "next_due_product": next_due.name if next_due else None,
+        "next_due_date": next_due.best_before_date if next_due else None,
+    }
+
+
+def _picture_url(kind: str, file_name: str | None) -> str | None:
+    """Proxy URL to a Grocy picture."""
+    if file_name:
+        b64name = base64.b64encode(file_name.encode("ascii"))
+        return f"/api/grocy/{kind}/{str(b64name, 'utf-8')}"
+    return None
+
+
+def _plain_value(value: Any) -> Any:
+    """Convert pygrocy models, also inside lists, to their dict representation."""
+    if isinstance(value, DataModel):
+        return {key: _plain_value(item) for key, item in value.as_dict().items()}
+    if isinstance(value, list):
+        return [_plain_value(item) for item in value]
+    return value
+
+
+def _model_fields(model_class: Type[DataModel]) -> Tuple[str, ...]:
+    """Names of the properties pygrocy includes in as_dict, in order."""
+    return tuple(
+        name
+        for name, value in vars(model_class).items()
+        if isinstance(value, property)
+    )
+
+
+class GrocyRecord:
+    """Compact snapshot of a pygrocy model.
+
+    The values of the model's properties, and any derived fields, are computed
+    once at construction and stored in slots. Nested models are stored as
+    plain dicts, so as_dict() serializes to the same JSON as the model.
+    """
+
+    __slots__: Tuple[str, ...] = ()
+    # Derived fields that are kept out of the attributes.
+    _internal_fields: Tuple[str, ...] = ()
+    _attribute_fields: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Determine the fields that as_dict() returns."""
+        super().__init_subclass__(**kwargs)
+        cls._attribute_fields = tuple(
+            name for name in cls.__slots__ if name not in cls._internal_fields
+        )
+
+    @classmethod
+    def from_model(cls, model: DataModel, **derived: Any) -> GrocyRecord:
+        """Create a record from a pygrocy model and the derived fields."""
+        record = object.__new__(cls)
+        for name in cls.__slots__:
+            if name in derived:
+                setattr(record, name, derived[name])
+            else:
+                setattr(record, name, _plain_value(getattr(model, name)))
+        return record
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> GrocyRecord:
+        """Create a record from the values of all its fields, in slot order."""
+        record = object.__new__(cls)
+        for name, value in zip(cls.__slots__, values, strict=True):
+            setattr(record, name, value)
+        return record
+
+    def values(self) -> List[Any]:
+        """Return the values of all fields, in slot order."""
+        return [getattr(self, name) for name in self.__slots__]
+
+    def replace(self, **changes: Any) -> GrocyRecord:
+        """Return a copy of the record with the given fields changed."""
+        record = object.__new__(type(self))
+        for name in self.__slots__:
+            setattr(record, name, changes.get(name, getattr(self, name)))
+        return record
 
-    def __init__(self, meal_plan: MealPlanItem):
-        self._meal_plan = meal_plan
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the attributes of the record."""
+        return {name: getattr(self, name) for name in self._attribute_fields}
 
-    @property
-    def meal_plan(self) -> MealPlanItem:
-        """The pygrocy MealPlanItem."""
-        return self._meal_plan
+    def __repr__(self) -> str:
+        """Return the representation of the record."""
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
 
-    @property
-    def picture_url(self) -> str | None:
-        """Proxy URL to the picture."""
-        recipe = self.meal_plan.recipe
-        if recipe and recipe.picture_file_name:
-            b64name = base64.b64encode(recipe.picture_file_name.encode("ascii"))
-            return f"/api/grocy/recipepictures/{str(b64name, 'utf-8')}"
-        return None
 
-    def as_dict(self) -> Dict[str, Any]:
-        """Return attributes for the pygrocy MealPlanItem object including picture URL."""
-        props = self.meal_plan.as_dict()
-        props["picture_url"] = self.picture_url
-        return props
-    
-class ProductWrapper:
-    """Wrapper around the pygrocy CurrentStockResponse."""
-
-    def __init__(self, product: CurrentStockResponse, hass):
-        self._product = Product(product)
-        self._hass = hass
-        self._picture_url = self.get_picture_url(product)
-
-    @property
-    def product(self) -> Product:
-        """The pygrocy Product."""
-        return self._product
-
-    @property
-    def picture_url(self) -> str | None:
-        """Proxy URL to the picture."""
-        return self._picture_url
-
-    def get_picture_url(self, product: CurrentStockResponse) -> str | None:
-        """Proxy URL to the picture."""
-        
-        if product.product and product.product.picture_file_name:
-            b64name = base64.b64encode(product.product.picture_file_name.encode("ascii"))
-            return f"/api/grocy/productpictures/{str(b64name, 'utf-8')}"
-        
-        return None        
+class ProductRecord(GrocyRecord):
+    """Product in stock, including the proxy URL to its picture."""
 
-    def as_dict(self) -> Dict[str, Any]:
-        """Return attributes for the pygrocy Product object including picture URL."""        
-        props = self.product.as_dict()
-        props["picture_url"] = self.picture_url
-        return props
\ No newline at end of file
+    __slots__ = _model_fields(Product) + ("picture_url", "location_id")
+    _internal_fields = ("location_id",)
+
+    @classmethod
+    def from_stock(cls, stock: CurrentStockResponse) -> ProductRecord:
+        """Create a record from a current stock entry."""
+        product = stock.product
+        return cls.from_model(
+            Product(stock),
+            picture_url=_picture_url(
+                "productpictures", product.picture_file_name if product else None
+            ),
+            location_id=product.location_id if product else None,
+        )
+
+    def with_stock_change(self, amount: float = 0, opened: float = 0) -> ProductRecord:
+        """Return a copy with the stock and opened amounts changed by the deltas."""
+        available = max(0, (self.available_amount or 0) + amount)
+        aggregated = max(0, (self.amount_aggregated or 0) + amount)
+        return self.replace(
+            available_amount=available,
+            amount_aggregated=aggregated,
+            amount_opened=min(available, max(0, (self.amount_opened or 0) + opened)),
+            amount_opened_aggregated=min(
+                aggregated, max(0, (self.amount_opened_aggregated or 0) + opened)
+            ),
+        )
+
+
+class VolatileProductRecord(GrocyRecord):
+    """Due, overdue, expired or missing product."""
+
+    __slots__ = _model_fields(Product)
+
+
+class ShoppingListRecord(GrocyRecord):
+    """Shopping list item."""
+
+    __slots__ = _model_fields(ShoppingListProduct)
+
+
+class MealPlanRecord(GrocyRecord):
+    """Meal plan item, including the proxy URL to its recipe picture."""
+
+    __slots__ = _model_fields(MealPlanItem) + ("picture_url",)
+
+    @classmethod
+    def from_meal_plan(cls, meal_plan: MealPlanItem) -> MealPlanRecord:
+        """Create a record from a pygrocy MealPlanItem."""
+        recipe = meal_plan.recipe
+        return cls.from_model(
+            meal_plan,
+            picture_url=_picture_url(
+                "recipepictures", recipe.picture_file_name if recipe else None
+            ),
+        )
+
+
+class ChoreRecord(GrocyRecord):
+    """Chore."""
+
+    __slots__ = _model_fields(Chore)
+
+
+class TaskRecord(GrocyRecord):
+    """Task."""
+
+    __slots__ = _model_fields(Task)
+
+
+class BatteryRecord(GrocyRecord):
+    """Battery."""
+
+    __slots__ = _model_fields(Battery)
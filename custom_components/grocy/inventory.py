@@ -0,0 +1,175 @@
+"""Indexed store of the Grocy stock."""
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .const import ATTR_STOCK
+from .helpers import ProductRecord
+
+
+PRODUCT_KEY_PREFIX = f"{ATTR_STOCK}_product_"
+LOCATION_KEY_PREFIX = f"{ATTR_STOCK}_location_"
+
+
+def product_key(product_id: int) -> str:
+    """Listener context and entity key of a product."""
+    return f"{PRODUCT_KEY_PREFIX}{product_id}"
+
+
+def location_key(location_id: int) -> str:
+    """Listener context and entity key of a location."""
+    return f"{LOCATION_KEY_PREFIX}{location_id}"
+
+
+@dataclass(frozen=True)
+class LocationTotals:
+    """Stock totals of the products stored at a location by default."""
+
+    location_id: int
+    product_count: int
+    amount: float
+    next_due_date: datetime | None
+
+
+class InventoryStore:
+    """Products in stock, indexed by id, location, product group and due date.
+
+    The store is updated incrementally: only products whose values changed
+    since the previous update are re-indexed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self.products: Dict[int, ProductRecord] = {}
+        self.locations: Dict[int, LocationTotals] = {}
+        self._by_location: Dict[int, Set[int]] = {}
+        self._by_group: Dict[Any, Set[int]] = {}
+        # (due date, product id), sorted by due date.
+        self._due: List[Tuple[datetime, int]] = []
+        # Barcode to product id, loaded on demand and dropped on stock changes.
+        self.barcodes: Dict[str, int] | None = None
+
+    def update(self, stock: Iterable[ProductRecord]) -> Set[str]:
+        """Update the store and return the keys of the changed products and locations."""
+        products = {product.id: product for product in stock}
+        changed_products = [
+            product_id
+            for product_id in products.keys() | self.products.keys()
+            if self._has_changed(self.products.get(product_id), products.get(product_id))
+        ]
+        if not changed_products:
+            return set()
+
+        changed_locations: Set[int] = set()
+        for product_id in changed_products:
+            old = self.products.get(product_id)
+            if old is not None:
+                self._unindex(old)
+                changed_locations.add(old.location_id)
+            new = products.get(product_id)
+            if new is not None:
+                self._index(new)
+                changed_locations.add(new.location_id)
+
+        self.products = products
+        self.barcodes = None
+
+        changed = {product_key(product_id) for product_id in changed_products}
+        for location_id in changed_locations - {None}:
+            totals = self._location_totals(location_id)
+            if totals != self.locations.get(location_id):
+                changed.add(location_key(location_id))
+            if totals is None:
+                self.locations.pop(location_id, None)
+            else:
+                self.locations[location_id] = totals
+
+        return changed
+
+    def set_barcodes(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Set the barcodes from Grocy's product_barcodes objects."""
+        self.barcodes = {
+            str(row["barcode"]): row["product_id"]
+            for row in rows
+            if row.get("barcode") and row.get("product_id") is not None
+        }
+
+    def product_by_barcode(self, barcode: str) -> ProductRecord | None:
+        """Return the product in stock with a barcode."""
+        if self.barcodes is None or barcode not in self.barcodes:
+            return None
+        return self.products.get(self.barcodes[barcode])
+
+    def products_at_location(self, location_id: int) -> List[ProductRecord]:
+        """Return the products stored at a location by default."""
+        return [
+            self.products[product_id]
+            for product_id in self._by_location.get(location_id, ())
+        ]
+
+    def products_in_group(self, product_group_id: Any) -> List[ProductRecord]:
+        """Return the products of a product group."""
+        return [
+            self.products[product_id]
+            for product_id in self._by_group.get(product_group_id, ())
+        ]
+
+    def products_due_before(self, due_date: datetime) -> List[ProductRecord]:
+        """Return the products due before a date, the earliest first."""
+        end = bisect.bisect_left(self._due, (due_date,))
+        return [self.products[product_id] for _, product_id in self._due[:end]]
+
+    def next_due(self, count: int) -> List[ProductRecord]:
+        """Return the products that are due next."""
+        return [self.products[product_id] for _, product_id in self._due[:count]]
+
+    @staticmethod
+    def _has_changed(old: ProductRecord | None, new: ProductRecord | None) -> bool:
+        """Return True if a product was added, removed or changed."""
+        if old is new:
+            return False
+        if old is None or new is None:
+            return True
+        return old.location_id != new.location_id or old.as_dict() != new.as_dict()
+
+    def _index(self, product: ProductRecord) -> None:
+        """Add a product to the indexes."""
+        self._by_location.setdefault(product.location_id, set()).add(product.id)
+        self._by_group.setdefault(product.product_group_id, set()).add(product.id)
+        if product.best_before_date is not None:
+            bisect.insort(self._due, (product.best_before_date, product.id))
+
+    def _unindex(self, product: ProductRecord) -> None:
+        """Remove a product from the indexes."""
+        for index, key in (
+            (self._by_location, product.location_id),
+            (self._by_group, product.product_group_id),
+        ):
+            product_ids = index.get(key)
+            if product_ids is not None:
+                product_ids.discard(product.id)
+                if not product_ids:
+                    del index[key]
+
+        if product.best_before_date is not None:
+            entry = (product.best_before_date, product.id)
+            position = bisect.bisect_left(self._due, entry)
+            if position < len(self._due) and self._due[position] == entry:
+                del self._due[position]
+
+    def _location_totals(self, location_id: int) -> LocationTotals | None:
+        """Sum up the products of a location."""
+        products = self.products_at_location(location_id)
+        if not products:
+            return None
+
+        due_dates = [p.best_before_date for p in products if p.best_before_date]
+        return LocationTotals(
+            location_id=location_id,
+            product_count=len(products),
+            amount=sum(product.available_amount or 0 for product in products),
+            next_due_date=min(due_dates, default=None),
+        )
@@ -0,0 +1,140 @@
+"""Timing and payload metrics of the Grocy integration."""
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+# Object ids in endpoint paths, e.g. stock/products/12 -> stock/products/{id}.
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_name(method: str, end_url: str) -> str:
+    """Return the method and path of a request with object ids replaced."""
+    return f"{method} {_ID_SEGMENT.sub('/{id}', '/' + end_url)}"
+
+
+@dataclass
+class EndpointMetrics:
+    """Requests sent to one Grocy API endpoint."""
+
+    requests: int = 0
+    errors: int = 0
+    unchanged: int = 0
+    total_time: float = 0
+    max_time: float = 0
+    last_time: float = 0
+    total_bytes: int = 0
+    last_bytes: int = 0
+    total_decode_time: float = 0
+
+
+@dataclass
+class DatasetMetrics:
+    """Fetches and serializations of one dataset."""
+
+    fetches: int = 0
+    last_fetch_time: float = 0
+    max_fetch_time: float = 0
+    last_build_time: float = 0
+    item_count: int = 0
+    serializations: int = 0
+    last_serialization_time: float = 0
+    max_serialization_time: float = 0
+
+
+@dataclass
+class RefreshMetrics:
+    """Summary of a coordinator refresh."""
+
+    duration: float = 0
+    requests: int = 0
+    bytes: int = 0
+    datasets: List[str] = field(default_factory=list)
+
+
+class GrocyMetrics:
+    """Collect the timing and payload metrics of requests, datasets and refreshes.
+
+    Times are in seconds and sizes in bytes. Only totals and the latest values
+    are kept, so collecting them costs a few additions per request.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self.datasets: Dict[str, DatasetMetrics] = {}
+        self.last_refresh: RefreshMetrics | None = None
+        self._requests = 0
+        self._bytes = 0
+        self._refresh_start: tuple[int, int] = (0, 0)
+        self._refreshed: List[str] = []
+
+    def record_request(
+        self,
+        endpoint: str,
+        duration: float,
+        size: int,
+        decode_time: float = 0,
+        error: bool = False,
+        unchanged: bool = False,
+    ) -> None:
+        """Record a request to an endpoint."""
+        metrics = self.endpoints.setdefault(endpoint, EndpointMetrics())
+        metrics.requests += 1
+        metrics.errors += error
+        metrics.unchanged += unchanged
+        metrics.total_time += duration
+        metrics.max_time = max(metrics.max_time, duration)
+        metrics.last_time = duration
+        metrics.total_bytes += size
+        metrics.last_bytes = size
+        metrics.total_decode_time += decode_time
+        self._requests += 1
+        self._bytes += size
+
+    def record_fetch(self, key: str, duration: float, item_count: int) -> None:
+        """Record a fetch of a dataset."""
+        metrics = self.datasets.setdefault(key, DatasetMetrics())
+        metrics.fetches += 1
+        metrics.last_fetch_time = duration
+        metrics.max_fetch_time = max(metrics.max_fetch_time, duration)
+        metrics.item_count = item_count
+        self._refreshed.append(key)
+
+    def record_build(self, key: str, duration: float) -> None:
+        """Record the time spent wrapping the responses of a dataset."""
+        self.datasets.setdefault(key, DatasetMetrics()).last_build_time = duration
+
+    def record_serialization(self, key: str, duration: float) -> None:
+        """Record the time spent serializing the attributes of a dataset."""
+        metrics = self.datasets.setdefault(key, DatasetMetrics())
+        metrics.serializations += 1
+        metrics.last_serialization_time = duration
+        metrics.max_serialization_time = max(metrics.max_serialization_time, duration)
+
+    def start_refresh(self) -> None:
+        """Mark the start of a coordinator refresh."""
+        self._refresh_start = (self._requests, self._bytes)
+        self._refreshed = []
+
+    def finish_refresh(self, duration: float) -> None:
+        """Summarize the requests and fetches since the start of the refresh."""
+        requests, size = self._refresh_start
+        self.last_refresh = RefreshMetrics(
+            duration=duration,
+            requests=self._requests - requests,
+            bytes=self._bytes - size,
+            datasets=sorted(self._refreshed),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics, slowest endpoints first."""
+        endpoints = sorted(
+            self.endpoints.items(), key=lambda item: item[1].total_time, reverse=True
+        )
+        return {
+            "last_refresh": asdict(self.last_refresh) if self.last_refresh else None,
+            "datasets": {key: asdict(value) for key, value in self.datasets.items()},
+            "endpoints": {key: asdict(value) for key, value in endpoints},
+        }
@@ -0,0 +1,190 @@
+"""Cache for pictures proxied from Grocy."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import time
+from typing import Dict, Tuple
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+PictureKey = Tuple[str, str, int]
+
+
+@dataclass
+class CachedPicture:
+    """Proxied picture with its response headers and validators."""
+
+    body: bytes
+    headers: Dict[str, str]
+    etag: str | None = None
+    last_modified: str | None = None
+    validated: float = field(default_factory=time)
+
+    @property
+    def size(self) -> int:
+        """Size of the picture in bytes."""
+        return len(self.body)
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Return True if the picture can be served without revalidation."""
+        return time() - self.validated < max_age
+
+
+def _file_name(key: PictureKey) -> str:
+    """Return the disk cache file name for a picture."""
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+class GrocyPictureCache:
+    """Size bounded LRU cache of proxied pictures with an optional disk tier."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_size: int,
+        max_entry_size: int,
+        disk_path: str | None = None,
+        max_disk_size: int = 0,
+    ) -> None:
+        """Initialize the cache."""
+        self._hass = hass
+        self._max_size = max_size
+        self.max_entry_size = max_entry_size
+        self._entries: OrderedDict[PictureKey, CachedPicture] = OrderedDict()
+        self._size = 0
+        self._disk_path = disk_path
+        self._max_disk_size = max_disk_size
+        self._disk_entries: OrderedDict[str, int] | None = None
+        self._disk_size = 0
+
+    async def async_get(self, key: PictureKey) -> CachedPicture | None:
+        """Return a cached picture from memory or disk."""
+        if (picture := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            return picture
+
+        if self._disk_path is None:
+            return None
+
+        disk_entries = await self._async_get_disk_entries()
+        name = _file_name(key)
+        if name not in disk_entries:
+            return None
+
+        picture = await self._hass.async_add_executor_job(self._read_from_disk, name)
+        if picture is None:
+            self._disk_size -= disk_entries.pop(name)
+            return None
+
+        disk_entries.move_to_end(name)
+        self._store_in_memory(key, picture)
+        return picture
+
+    async def async_set(self, key: PictureKey, picture: CachedPicture) -> None:
+        """Store a picture in memory and, if enabled, on disk."""
+        if picture.size > self.max_entry_size:
+            return
+
+        self._store_in_memory(key, picture)
+
+        if self._disk_path is None or picture.size > self._max_disk_size:
+            return
+
+        disk_entries = await self._async_get_disk_entries()
+        name = _file_name(key)
+        self._disk_size -= disk_entries.pop(name, 0)
+        disk_entries[name] = picture.size
+        self._disk_size += picture.size
+
+        evicted = []
+        while self._disk_size > self._max_disk_size:
+            evicted_name, evicted_size = disk_entries.popitem(last=False)
+            self._disk_size -= evicted_size
+            evicted.append(evicted_name)
+
+        await self._hass.async_add_executor_job(
+            self._write_to_disk, name, picture, evicted
+        )
+
+    def _store_in_memory(self, key: PictureKey, picture: CachedPicture) -> None:
+        """Store a picture in memory, evicting the least recently used ones."""
+        if (previous := self._entries.pop(key, None)) is not None:
+            self._size -= previous.size
+
+        if picture.size > self._max_size:
+            return
+
+        self._entries[key] = picture
+        self._size += picture.size
+        while self._size > self._max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    async def _async_get_disk_entries(self) -> OrderedDict[str, int]:
+        """Return the disk cache index, loading it on first use."""
+        if self._disk_entries is None:
+            self._disk_entries = await self._hass.async_add_executor_job(
+                self._load_disk_entries
+            )
+            self._disk_size = sum(self._disk_entries.values())
+        return self._disk_entries
+
+    def _load_disk_entries(self) -> OrderedDict[str, int]:
+        """Index the pictures on disk, oldest first."""
+        os.makedirs(self._disk_path, exist_ok=True)
+        entries = []
+        with os.scandir(self._disk_path) as files:
+            for entry in files:
+                name, extension = os.path.splitext(entry.name)
+                if extension == ".bin":
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, name, stat.st_size))
+
+        return OrderedDict((name, size) for _, name, size in sorted(entries))
+
+    def _read_from_disk(self, name: str) -> CachedPicture | None:
+        """Read a picture and its metadata from disk."""
+        path = os.path.join(self._disk_path, name)
+        try:
+            with open(f"{path}.json", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            with open(f"{path}.bin", "rb") as body_file:
+                body = body_file.read()
+        except (OSError, ValueError) as error:
+            _LOGGER.debug("Could not read cached picture %s: %s", name, error)
+            return None
+
+        return CachedPicture(body=body, **meta)
+
+    def _write_to_disk(
+        self, name: str, picture: CachedPicture, evicted: list[str]
+    ) -> None:
+        """Write a picture to disk and remove evicted ones."""
+        path = os.path.join(self._disk_path, name)
+        meta = {
+            "headers": picture.headers,
+            "etag": picture.etag,
+            "last_modified": picture.last_modified,
+            "validated": picture.validated,
+        }
+        try:
+            with open(f"{path}.bin", "wb") as body_file:
+                body_file.write(picture.body)
+            with open(f"{path}.json", "w", encoding="utf-8") as meta_file:
+                json.dump(meta, meta_file)
+        except OSError as error:
+            _LOGGER.debug("Could not write cached picture %s: %s", name, error)
+
+        for evicted_name in evicted:
+            for extension in (".bin", ".json"):
+                try:
+                    os.remove(os.path.join(self._disk_path, evicted_name + extension))
+                except OSError:
+                    pass
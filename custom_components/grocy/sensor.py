@@ -4,17 +4,21 @@ from __future__ import annotations
 import logging
 from collections.abc import Callable, Mapping
 from dataclasses import dataclass
-from typing import Any, List
+from typing import Any, Dict, List
 
 from homeassistant.components.sensor import (
+    SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
+from pygrocy2.data_models.generic import EntityType
 
 from .const import (
     ATTR_BATTERIES,
@@ -24,6 +28,9 @@ from .const import (
     ATTR_STOCK,
     ATTR_TASKS,
     CHORES,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_RECORD_ATTRIBUTES,
+    CONF_STOCK_ITEM_ENTITIES,
     DOMAIN,
     ITEMS,
     MEAL_PLANS,
@@ -32,6 +39,20 @@ from .const import (
 )
 from .coordinator import GrocyDataUpdateCoordinator
 from .entity import GrocyEntity
+from .helpers import (
+    ProductRecord,
+    due_date_sort_key,
+    products_summary,
+    shopping_list_sort_key,
+)
+from .inventory import (
+    LOCATION_KEY_PREFIX,
+    PRODUCT_KEY_PREFIX,
+    LocationTotals,
+    location_key,
+    product_key,
+)
+from .metrics import GrocyMetrics
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,9 +65,14 @@ async def async_setup_entry(
     """Setup sensor platform."""
     coordinator: GrocyDataUpdateCoordinator = hass.data[DOMAIN]
     entities = []
+    entity_class = (
+        GrocyRecordedSensorEntity
+        if config_entry.options.get(CONF_RECORD_ATTRIBUTES, False)
+        else GrocySensorEntity
+    )
     for description in SENSORS:
         if description.exists_fn(coordinator.available_entities):
-            entity = GrocySensorEntity(coordinator, description, config_entry)
+            entity = entity_class(coordinator, description, config_entry)
             coordinator.entities.append(entity)
             entities.append(entity)
         else:
@@ -55,7 +81,117 @@ async def async_setup_entry(
                 description.key,
             )
 
-    async_add_entities(entities, True)
+    if config_entry.options.get(CONF_DIAGNOSTIC_SENSORS, False):
+        entities.extend(
+            GrocyDiagnosticSensorEntity(coordinator, description, config_entry)
+            for description in DIAGNOSTIC_SENSORS
+        )
+
+    async_add_entities(entities)
+
+    if config_entry.options.get(
+        CONF_STOCK_ITEM_ENTITIES, False
+    ) and ATTR_STOCK in coordinator.available_entities:
+        _async_setup_stock_item_entities(coordinator, config_entry, async_add_entities)
+
+
+@callback
+def _async_setup_stock_item_entities(
+    coordinator: GrocyDataUpdateCoordinator,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add product and location entities, and new ones whenever the stock changes.
+
+    The location names are loaded in the background so platform setup doesn't
+    wait for Grocy; location entities are added once the names are known.
+    Entities of products and locations that are no longer in stock are removed.
+    """
+    location_names: Dict[int, str] | None = None
+    added_keys = set()
+
+    @callback
+    def async_add_stock_item_entities() -> None:
+        """Add entities for products and locations that have none yet."""
+        inventory = coordinator.grocy_data.inventory
+        new_entities = []
+        for product_id, product in inventory.products.items():
+            if product_key(product_id) not in added_keys:
+                added_keys.add(product_key(product_id))
+                new_entities.append(
+                    GrocyProductSensorEntity(
+                        coordinator, config_entry, product_id, product.name
+                    )
+                )
+
+        for location_id in inventory.locations:
+            if location_names is None:
+                break
+            if location_key(location_id) not in added_keys:
+                added_keys.add(location_key(location_id))
+                new_entities.append(
+                    GrocyLocationSensorEntity(
+                        coordinator,
+                        config_entry,
+                        location_id,
+                        location_names.get(location_id, str(location_id)),
+                    )
+                )
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+        _async_remove_stale_entities()
+
+    @callback
+    def _async_remove_stale_entities() -> None:
+        """Remove the registered entities of products and locations not in stock."""
+        if not coordinator.data or ATTR_STOCK not in coordinator.data:
+            return
+
+        inventory = coordinator.grocy_data.inventory
+        current_keys = {product_key(product_id) for product_id in inventory.products}
+        prefixes = (PRODUCT_KEY_PREFIX,)
+        if location_names is not None:
+            current_keys.update(
+                location_key(location_id) for location_id in inventory.locations
+            )
+            prefixes += (LOCATION_KEY_PREFIX,)
+
+        registry = er.async_get(coordinator.hass)
+        for entry in er.async_entries_for_config_entry(
+            registry, config_entry.entry_id
+        ):
+            key = entry.unique_id[len(config_entry.entry_id) :]
+            if key.startswith(prefixes) and key not in current_keys:
+                _LOGGER.debug("Removing %s, it is no longer in stock", entry.entity_id)
+                added_keys.discard(key)
+                registry.async_remove(entry.entity_id)
+
+    async def _async_load_location_names() -> None:
+        """Get the location names and add the location entities."""
+        nonlocal location_names
+        try:
+            locations = await coordinator.grocy_api.get_generic_objects_for_type(
+                EntityType.LOCATIONS
+            )
+            location_names = {
+                location["id"]: location["name"] for location in locations
+            }
+        except Exception as error:  # pylint: disable=broad-except
+            _LOGGER.debug("Could not get the Grocy locations: %s", error)
+            location_names = {}
+        async_add_stock_item_entities()
+
+    async_add_stock_item_entities()
+    config_entry.async_on_unload(
+        coordinator.async_add_listener(async_add_stock_item_entities, ATTR_STOCK)
+    )
+    config_entry.async_create_background_task(
+        coordinator.hass,
+        _async_load_location_names(),
+        f"{DOMAIN} location names",
+    )
 
 
 @dataclass
@@ -63,6 +199,9 @@ class GrocySensorEntityDescription(SensorEntityDescription):
     """Grocy sensor entity description."""
 
     attributes_fn: Callable[[List[Any]], Mapping[str, Any] | None] = lambda _: None
+    # Only descriptions with a sort key honour the attribute mode option.
+    sort_key: Callable[[Any], Any] | None = None
+    summary_fn: Callable[[List[Any]], Mapping[str, Any]] = lambda _: {}
     exists_fn: Callable[[List[str]], bool] = lambda _: True
     entity_registry_enabled_default: bool = False
 
@@ -103,6 +242,8 @@ SENSORS: tuple[GrocySensorEntityDescription, ...] = (
             "products": [x.as_dict() for x in data],
             "count": len(data),
         },
+        sort_key=shopping_list_sort_key,
+        summary_fn=lambda data: {"amount": sum(x.amount or 0 for x in data)},
     ),
     GrocySensorEntityDescription(
         key=ATTR_STOCK,
@@ -115,6 +256,11 @@ SENSORS: tuple[GrocySensorEntityDescription, ...] = (
             "products": [x.as_dict() for x in data],
             "count": len(data),
         },
+        sort_key=due_date_sort_key,
+        summary_fn=lambda data: {
+            **products_summary(data),
+            "opened": sum(1 for x in data if x.amount_opened),
+        },
     ),
     GrocySensorEntityDescription(
         key=ATTR_TASKS,
@@ -152,3 +298,234 @@ class GrocySensorEntity(GrocyEntity, SensorEntity):
         entity_data = self.coordinator.data.get(self.entity_description.key, None)
 
         return len(entity_data) if entity_data else 0
+
+
+class GrocyRecordedSensorEntity(GrocySensorEntity):
+    """Grocy sensor entity that also records its item lists."""
+
+    _unrecorded_attributes = frozenset()
+
+
+class GrocyProductSensorEntity(GrocyEntity, SensorEntity):
+    """Stock amount of a single product."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: GrocyDataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        product_id: int,
+        name: str,
+    ) -> None:
+        """Initialize the product entity."""
+        super().__init__(
+            coordinator,
+            SensorEntityDescription(
+                key=product_key(product_id),
+                name=f"Grocy {name}",
+                icon="mdi:package-variant-closed",
+            ),
+            config_entry,
+        )
+        self._product_id = product_id
+
+    @property
+    def _product(self) -> ProductRecord | None:
+        """The product in stock, None if it is out of stock."""
+        return self.coordinator.grocy_data.inventory.products.get(self._product_id)
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the amount in stock."""
+        product = self._product
+        return product.available_amount if product else 0
+
+    @property
+    def entity_picture(self) -> str | None:
+        """Return the proxy URL to the product picture."""
+        product = self._product
+        return product.picture_url if product else None
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return the opened amount and next due date of the product."""
+        product = self._product
+        return {
+            "product_id": self._product_id,
+            "amount_opened": product.amount_opened if product else 0,
+            "next_due_date": product.best_before_date.isoformat()
+            if product and product.best_before_date
+            else None,
+            "location_id": product.location_id if product else None,
+        }
+
+
+class GrocyLocationSensorEntity(GrocyEntity, SensorEntity):
+    """Total stock amount at a single location."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: GrocyDataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        location_id: int,
+        name: str,
+    ) -> None:
+        """Initialize the location entity."""
+        super().__init__(
+            coordinator,
+            SensorEntityDescription(
+                key=location_key(location_id),
+                name=f"Grocy {name} stock",
+                icon="mdi:fridge-outline",
+            ),
+            config_entry,
+        )
+        self._location_id = location_id
+
+    @property
+    def _totals(self) -> LocationTotals | None:
+        """The stock totals of the location, None if it is empty."""
+        return self.coordinator.grocy_data.inventory.locations.get(self._location_id)
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the total amount in stock at the location."""
+        totals = self._totals
+        return totals.amount if totals else 0
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return the number of products and next due date at the location."""
+        totals = self._totals
+        return {
+            "location_id": self._location_id,
+            "product_count": totals.product_count if totals else 0,
+            "next_due_date": totals.next_due_date.isoformat()
+            if totals and totals.next_due_date
+            else None,
+        }
+
+
+def _milliseconds(seconds: float) -> float:
+    """Convert seconds to rounded milliseconds."""
+    return round(seconds * 1000, 1)
+
+
+@dataclass
+class GrocyDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Grocy diagnostic sensor entity description."""
+
+    value_fn: Callable[[GrocyMetrics], StateType] = lambda _: None
+    details_fn: Callable[[GrocyMetrics], Mapping[str, Any] | None] = lambda _: None
+
+
+DIAGNOSTIC_SENSORS: tuple[GrocyDiagnosticSensorEntityDescription, ...] = (
+    GrocyDiagnosticSensorEntityDescription(
+        key="refresh_duration",
+        name="Grocy refresh duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-outline",
+        value_fn=lambda metrics: _milliseconds(metrics.last_refresh.duration)
+        if metrics.last_refresh
+        else None,
+        details_fn=lambda metrics: {
+            "datasets": {
+                key: {
+                    "fetch_ms": _milliseconds(dataset.last_fetch_time),
+                    "build_ms": _milliseconds(dataset.last_build_time),
+                    "serialization_ms": _milliseconds(
+                        dataset.last_serialization_time
+                    ),
+                    "items": dataset.item_count,
+                }
+                for key, dataset in metrics.datasets.items()
+            }
+        },
+    ),
+    GrocyDiagnosticSensorEntityDescription(
+        key="refresh_requests",
+        name="Grocy refresh requests",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:swap-horizontal",
+        value_fn=lambda metrics: metrics.last_refresh.requests
+        if metrics.last_refresh
+        else None,
+        details_fn=lambda metrics: {"datasets": metrics.last_refresh.datasets}
+        if metrics.last_refresh
+        else None,
+    ),
+    GrocyDiagnosticSensorEntityDescription(
+        key="refresh_response_size",
+        name="Grocy refresh response size",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:download-network-outline",
+        value_fn=lambda metrics: metrics.last_refresh.bytes
+        if metrics.last_refresh
+        else None,
+        details_fn=lambda metrics: {
+            "endpoints": {
+                endpoint: requests.last_bytes
+                for endpoint, requests in metrics.endpoints.items()
+            }
+        },
+    ),
+    GrocyDiagnosticSensorEntityDescription(
+        key="hot_endpoint",
+        name="Grocy hot endpoint",
+        icon="mdi:speedometer-slow",
+        value_fn=lambda metrics: max(
+            metrics.endpoints,
+            key=lambda endpoint: metrics.endpoints[endpoint].total_time,
+            default=None,
+        ),
+        details_fn=lambda metrics: {
+            "endpoints": {
+                endpoint: {
+                    "requests": requests.requests,
+                    "errors": requests.errors,
+                    "unchanged": requests.unchanged,
+                    "total_ms": _milliseconds(requests.total_time),
+                    "mean_ms": _milliseconds(requests.total_time / requests.requests),
+                    "max_ms": _milliseconds(requests.max_time),
+                }
+                for endpoint, requests in metrics.endpoints.items()
+            }
+        },
+    ),
+)
+
+
+class GrocyDiagnosticSensorEntity(GrocyEntity, SensorEntity):
+    """Timing and payload metrics of the Grocy integration."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _unrecorded_attributes = frozenset({"datasets", "endpoints"})
+    entity_description: GrocyDiagnosticSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: GrocyDataUpdateCoordinator,
+        description: GrocyDiagnosticSensorEntityDescription,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the diagnostic entity."""
+        super().__init__(coordinator, description, config_entry)
+        # The metrics change with every refresh, not only with the datasets.
+        self.coordinator_context = None
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the metric."""
+        return self.entity_description.value_fn(self.coordinator.metrics)
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return the metric broken down by dataset or endpoint."""
+        return self.entity_description.details_fn(self.coordinator.metrics)
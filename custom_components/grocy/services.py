@@ -1,14 +1,35 @@
 """Grocy services."""
 from __future__ import annotations
 
+import asyncio
+
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
-from pygrocy2.grocy import EntityType, TransactionType
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+from pygrocy2.data_models.generic import EntityType
+from pygrocy2.grocy_api_client import TransactionType
 from datetime import datetime
-
-from .const import ATTR_CHORES, ATTR_TASKS, DOMAIN
+from functools import partial
+
+from .const import (
+    ATTR_CHORES,
+    ATTR_SHOPPING_LIST,
+    ATTR_STOCK,
+    ATTR_TASKS,
+    DATASETS,
+    DOMAIN,
+    STOCK_DATASETS,
+)
 from .coordinator import GrocyDataUpdateCoordinator
+from .grocy_data import apply_shopping_list_removal, apply_stock_changes
+from .helpers import due_date_sort_key, serialize_items
 
 SERVICE_PRODUCT_ID = "product_id"
 SERVICE_AMOUNT = "amount"
@@ -27,6 +48,14 @@ SERVICE_RECIPE_ID = "recipe_id"
 SERVICE_BATTERY_ID = "battery_id"
 SERVICE_OBJECT_ID = "object_id"
 SERVICE_LIST_ID = "list_id"
+SERVICE_ITEMS = "items"
+SERVICE_DATASET = "dataset"
+SERVICE_OFFSET = "offset"
+SERVICE_LIMIT = "limit"
+SERVICE_BARCODE = "barcode"
+SERVICE_LOCATION_ID = "location_id"
+SERVICE_PRODUCT_GROUP_ID = "product_group_id"
+SERVICE_DUE_BEFORE = "due_before"
 
 SERVICE_ADD_PRODUCT = "add_product_to_stock"
 SERVICE_OPEN_PRODUCT = "open_product"
@@ -40,13 +69,18 @@ SERVICE_CONSUME_RECIPE = "consume_recipe"
 SERVICE_TRACK_BATTERY = "track_battery"
 SERVICE_ADD_MISSING_PRODUCTS_TO_SHOPPING_LIST = "add_missing_products_to_shopping_list"
 SERVICE_REMOVE_PRODUCT_IN_SHOPPING_LIST = "remove_product_in_shopping_list"
+SERVICE_ADD_PRODUCTS = "add_products_to_stock"
+SERVICE_OPEN_PRODUCTS = "open_products"
+SERVICE_CONSUME_PRODUCTS = "consume_products_from_stock"
+SERVICE_GET_DATASET = "get_dataset"
+SERVICE_FIND_PRODUCTS = "find_products"
 
 SERVICE_ADD_PRODUCT_SCHEMA = vol.All(
     vol.Schema(
         {
             vol.Required(SERVICE_PRODUCT_ID): vol.Coerce(int),
             vol.Required(SERVICE_AMOUNT): vol.Coerce(float),
-            vol.Optional(SERVICE_PRICE): str,
+            vol.Optional(SERVICE_PRICE): cv.string,
         }
     )
 )
@@ -154,6 +188,60 @@ SERVICE_REMOVE_PRODUCT_IN_SHOPPING_LIST_SCHEMA = vol.All(
     )
 )
 
+SERVICE_ADD_PRODUCTS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(SERVICE_ITEMS): vol.All(
+                cv.ensure_list, [SERVICE_ADD_PRODUCT_SCHEMA]
+            ),
+        }
+    )
+)
+
+SERVICE_OPEN_PRODUCTS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(SERVICE_ITEMS): vol.All(
+                cv.ensure_list, [SERVICE_OPEN_PRODUCT_SCHEMA]
+            ),
+        }
+    )
+)
+
+SERVICE_CONSUME_PRODUCTS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(SERVICE_ITEMS): vol.All(
+                cv.ensure_list, [SERVICE_CONSUME_PRODUCT_SCHEMA]
+            ),
+        }
+    )
+)
+
+SERVICE_GET_DATASET_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(SERVICE_DATASET): vol.In(DATASETS),
+            vol.Optional(SERVICE_OFFSET, default=0): vol.All(
+                vol.Coerce(int), vol.Range(min=0)
+            ),
+            vol.Optional(SERVICE_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        }
+    )
+)
+
+SERVICE_FIND_PRODUCTS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(SERVICE_BARCODE): cv.string,
+            vol.Optional(SERVICE_LOCATION_ID): vol.Coerce(int),
+            vol.Optional(SERVICE_PRODUCT_GROUP_ID): vol.Coerce(int),
+            vol.Optional(SERVICE_DUE_BEFORE): cv.datetime,
+            vol.Optional(SERVICE_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        }
+    )
+)
+
 SERVICES_WITH_ACCOMPANYING_SCHEMA: list[tuple[str, vol.Schema]] = [
     (SERVICE_ADD_PRODUCT, SERVICE_ADD_PRODUCT_SCHEMA),
     (SERVICE_OPEN_PRODUCT, SERVICE_OPEN_PRODUCT_SCHEMA),
@@ -169,6 +257,17 @@ SERVICES_WITH_ACCOMPANYING_SCHEMA: list[tuple[str, vol.Schema]] = [
     (SERVICE_REMOVE_PRODUCT_IN_SHOPPING_LIST, SERVICE_REMOVE_PRODUCT_IN_SHOPPING_LIST_SCHEMA),
 ]
 
+BULK_SERVICES_WITH_ACCOMPANYING_SCHEMA: list[tuple[str, vol.Schema]] = [
+    (SERVICE_ADD_PRODUCTS, SERVICE_ADD_PRODUCTS_SCHEMA),
+    (SERVICE_OPEN_PRODUCTS, SERVICE_OPEN_PRODUCTS_SCHEMA),
+    (SERVICE_CONSUME_PRODUCTS, SERVICE_CONSUME_PRODUCTS_SCHEMA),
+]
+
+QUERY_SERVICES_WITH_ACCOMPANYING_SCHEMA: list[tuple[str, vol.Schema]] = [
+    (SERVICE_GET_DATASET, SERVICE_GET_DATASET_SCHEMA),
+    (SERVICE_FIND_PRODUCTS, SERVICE_FIND_PRODUCTS_SCHEMA),
+]
+
 
 async def async_setup_services(
     hass: HomeAssistant, config_entry: ConfigEntry  # pylint: disable=unused-argument
@@ -219,47 +318,114 @@ async def async_setup_services(
         elif service == SERVICE_REMOVE_PRODUCT_IN_SHOPPING_LIST:
             await async_remove_product_in_shopping_list_service(hass, coordinator, service_data)
 
+    async def async_call_grocy_bulk_service(
+        service_call: ServiceCall,
+    ) -> ServiceResponse:
+        """Call correct Grocy service for each item."""
+        service = service_call.service
+        items = service_call.data[SERVICE_ITEMS]
+
+        if service == SERVICE_ADD_PRODUCTS:
+            item_call = _async_add_product
+
+        elif service == SERVICE_OPEN_PRODUCTS:
+            item_call = _async_open_product
+
+        elif service == SERVICE_CONSUME_PRODUCTS:
+            item_call = _async_consume_product
+
+        return await async_bulk_stock_service(hass, coordinator, item_call, items)
+
+    async def async_call_grocy_query_service(
+        service_call: ServiceCall,
+    ) -> ServiceResponse:
+        """Call correct Grocy query service."""
+        service = service_call.service
+        service_data = service_call.data
+
+        if service == SERVICE_GET_DATASET:
+            return await async_get_dataset_service(hass, coordinator, service_data)
+
+        elif service == SERVICE_FIND_PRODUCTS:
+            return await async_find_products_service(hass, coordinator, service_data)
+
     for service, schema in SERVICES_WITH_ACCOMPANYING_SCHEMA:
         hass.services.async_register(DOMAIN, service, async_call_grocy_service, schema)
 
+    for service, schema in BULK_SERVICES_WITH_ACCOMPANYING_SCHEMA:
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            async_call_grocy_bulk_service,
+            schema,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
+    for service, schema in QUERY_SERVICES_WITH_ACCOMPANYING_SCHEMA:
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            async_call_grocy_query_service,
+            schema,
+            supports_response=SupportsResponse.ONLY,
+        )
+
 
 async def async_unload_services(hass: HomeAssistant) -> None:
     """Unload Grocy services."""
     if not hass.services.async_services().get(DOMAIN):
         return
 
-    for service, _ in SERVICES_WITH_ACCOMPANYING_SCHEMA:
+    for service, _ in (
+        SERVICES_WITH_ACCOMPANYING_SCHEMA
+        + BULK_SERVICES_WITH_ACCOMPANYING_SCHEMA
+        + QUERY_SERVICES_WITH_ACCOMPANYING_SCHEMA
+    ):
         hass.services.async_remove(DOMAIN, service)
 
 
 async def async_add_product_service(hass, coordinator, data):
     """Add a product in Grocy."""
+    change = await _async_add_product(coordinator, data)
+    _async_apply_stock_changes(coordinator, [change])
+
+
+async def async_open_product_service(hass, coordinator, data):
+    """Open a product in Grocy."""
+    change = await _async_open_product(coordinator, data)
+    _async_apply_stock_changes(coordinator, [change])
+
+
+async def async_consume_product_service(hass, coordinator, data):
+    """Consume a product in Grocy."""
+    change = await _async_consume_product(coordinator, data)
+    _async_apply_stock_changes(coordinator, [change])
+
+
+async def _async_add_product(coordinator, data):
+    """Add a product in Grocy and return its stock change."""
     product_id = data[SERVICE_PRODUCT_ID]
     amount = data[SERVICE_AMOUNT]
     price = data.get(SERVICE_PRICE, "")
 
-    def wrapper():
-        coordinator.grocy_api.add_product(product_id, amount, price)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.add_product(product_id, amount, price)
+    return product_id, amount, 0
 
 
-async def async_open_product_service(hass, coordinator, data):
-    """Open a product in Grocy."""
+async def _async_open_product(coordinator, data):
+    """Open a product in Grocy and return its stock change."""
     product_id = data[SERVICE_PRODUCT_ID]
     amount = data[SERVICE_AMOUNT]
     allow_subproduct_substitution = data.get(SERVICE_SUBPRODUCT_SUBSTITUTION, False)
 
-    def wrapper():
-        coordinator.grocy_api.open_product(
-            product_id, amount, allow_subproduct_substitution
-        )
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.open_product(
+        product_id, amount, allow_subproduct_substitution
+    )
+    return product_id, 0, amount
 
 
-async def async_consume_product_service(hass, coordinator, data):
-    """Consume a product in Grocy."""
+async def _async_consume_product(coordinator, data):
+    """Consume a product in Grocy and return its stock change."""
     product_id = data[SERVICE_PRODUCT_ID]
     amount = data[SERVICE_AMOUNT]
     spoiled = data.get(SERVICE_SPOILED, False)
@@ -271,16 +437,115 @@ async def async_consume_product_service(hass, coordinator, data):
     if transaction_type_raw is not None:
         transaction_type = TransactionType[transaction_type_raw]
 
-    def wrapper():
-        coordinator.grocy_api.consume_product(
-            product_id,
-            amount,
-            spoiled=spoiled,
-            transaction_type=transaction_type,
-            allow_subproduct_substitution=allow_subproduct_substitution,
+    await coordinator.grocy_api.consume_product(
+        product_id,
+        amount,
+        spoiled=spoiled,
+        transaction_type=transaction_type,
+        allow_subproduct_substitution=allow_subproduct_substitution,
+    )
+    return product_id, -amount, 0
+
+
+def _async_apply_stock_changes(coordinator, changes):
+    """Patch the stock with the (product id, amount, opened) changes and reconcile it once."""
+    combined = {}
+    for product_id, amount, opened in changes:
+        total_amount, total_opened = combined.get(product_id, (0, 0))
+        combined[product_id] = (total_amount + amount, total_opened + opened)
+
+    coordinator.async_apply_local_change(
+        ATTR_STOCK,
+        partial(apply_stock_changes, changes=combined),
+        STOCK_DATASETS,
+    )
+
+
+async def async_bulk_stock_service(hass, coordinator, item_call, items):
+    """Run a stock call for many items, then patch and refresh the stock once."""
+    semaphore = asyncio.Semaphore(max(1, coordinator.max_concurrent_requests))
+    changes = []
+
+    async def _async_call(item):
+        result = {SERVICE_PRODUCT_ID: item[SERVICE_PRODUCT_ID]}
+        async with semaphore:
+            try:
+                changes.append(await item_call(coordinator, item))
+            except Exception as error:  # pylint: disable=broad-except
+                result["success"] = False
+                result["error"] = str(error)
+            else:
+                result["success"] = True
+        return result
+
+    results = await asyncio.gather(*(_async_call(item) for item in items))
+    if changes:
+        _async_apply_stock_changes(coordinator, changes)
+
+    return {
+        "succeeded": len(changes),
+        "failed": len(results) - len(changes),
+        "results": results,
+    }
+
+
+async def async_get_dataset_service(hass, coordinator, data):
+    """Return a page of the full list of a dataset."""
+    items = await coordinator.async_get_dataset(data[SERVICE_DATASET])
+    offset = data[SERVICE_OFFSET]
+    limit = data.get(SERVICE_LIMIT)
+    page = items[offset : offset + limit] if limit else items[offset:]
+
+    return {
+        "items": serialize_items(page),
+        "count": len(items),
+        "offset": offset,
+    }
+
+
+async def async_find_products_service(hass, coordinator, data):
+    """Return the products in stock that match all given filters."""
+    grocy_data = coordinator.grocy_data
+    if coordinator.data is None or ATTR_STOCK not in coordinator.data:
+        grocy_data.inventory.update(await coordinator.async_get_dataset(ATTR_STOCK))
+
+    inventory = grocy_data.inventory
+    candidates = None
+    if SERVICE_BARCODE in data:
+        product = await grocy_data.async_get_product_by_barcode(data[SERVICE_BARCODE])
+        candidates = [product] if product else []
+    if SERVICE_LOCATION_ID in data:
+        candidates = _matching_products(
+            candidates, inventory.products_at_location(data[SERVICE_LOCATION_ID])
         )
+    if SERVICE_PRODUCT_GROUP_ID in data:
+        candidates = _matching_products(
+            candidates, inventory.products_in_group(data[SERVICE_PRODUCT_GROUP_ID])
+        )
+    if SERVICE_DUE_BEFORE in data:
+        due_before = data[SERVICE_DUE_BEFORE]
+        if due_before.tzinfo is not None:
+            # Grocy due dates are naive local times.
+            due_before = dt_util.as_local(due_before).replace(tzinfo=None)
+        candidates = _matching_products(
+            candidates, inventory.products_due_before(due_before)
+        )
+    if candidates is None:
+        candidates = list(inventory.products.values())
+
+    products = sorted(candidates, key=due_date_sort_key)
+    if limit := data.get(SERVICE_LIMIT):
+        products = products[:limit]
 
-    await hass.async_add_executor_job(wrapper)
+    return {"products": serialize_items(products), "count": len(candidates)}
+
+
+def _matching_products(candidates, products):
+    """Return the products that are also candidates, all if there are no candidates yet."""
+    if candidates is None:
+        return products
+    product_ids = {product.id for product in products}
+    return [product for product in candidates if product.id in product_ids]
 
 
 async def async_execute_chore_service(hass, coordinator, data):
@@ -292,10 +557,7 @@ async def async_execute_chore_service(hass, coordinator, data):
     tracked_time = datetime.now() if should_track_now else None
     skipped = data.get(SERVICE_SKIPPED, False)
 
-    def wrapper():
-        coordinator.grocy_api.execute_chore(chore_id, done_by, tracked_time, skipped=skipped)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.execute_chore(chore_id, done_by, tracked_time, skipped=skipped)
     await _async_force_update_entity(coordinator, ATTR_CHORES)
 
 
@@ -303,10 +565,7 @@ async def async_complete_task_service(hass, coordinator, data):
     """Complete a task in Grocy."""
     task_id = data[SERVICE_TASK_ID]
 
-    def wrapper():
-        coordinator.grocy_api.complete_task(task_id)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.complete_task(task_id)
     await _async_force_update_entity(coordinator, ATTR_TASKS)
 
 
@@ -320,10 +579,7 @@ async def async_add_generic_service(hass, coordinator, data):
 
     data = data[SERVICE_DATA]
 
-    def wrapper():
-        coordinator.grocy_api.add_generic(entity_type, data)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.add_generic(entity_type, data)
     await post_generic_refresh(coordinator, entity_type);
 
 
@@ -339,10 +595,7 @@ async def async_update_generic_service(hass, coordinator, data):
 
     data = data[SERVICE_DATA]
 
-    def wrapper():
-        coordinator.grocy_api.update_generic(entity_type, object_id, data)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.update_generic(entity_type, object_id, data)
     await post_generic_refresh(coordinator, entity_type);
 
 
@@ -356,10 +609,7 @@ async def async_delete_generic_service(hass, coordinator, data):
 
     object_id = data[SERVICE_OBJECT_ID]
 
-    def wrapper():
-        coordinator.grocy_api.delete_generic(entity_type, object_id)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.delete_generic(entity_type, object_id)
     await post_generic_refresh(coordinator, entity_type);
 
 
@@ -371,29 +621,20 @@ async def async_consume_recipe_service(hass, coordinator, data):
     """Consume a recipe in Grocy."""
     recipe_id = data[SERVICE_RECIPE_ID]
 
-    def wrapper():
-        coordinator.grocy_api.consume_recipe(recipe_id)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.consume_recipe(recipe_id)
 
 
 async def async_track_battery_service(hass, coordinator, data):
     """Track a battery in Grocy."""
     battery_id = data[SERVICE_BATTERY_ID]
 
-    def wrapper():
-        coordinator.grocy_api.charge_battery(battery_id)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.charge_battery(battery_id)
 
 async def async_add_missing_products_to_shopping_list(hass, coordinator, data):
     """Adds currently missing proudcts (below defined min. stock amount) to the given shopping list."""
     list_id = data.get(SERVICE_LIST_ID, 1)
 
-    def wrapper():
-        coordinator.grocy_api.add_missing_product_to_shopping_list(list_id)
-    
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.add_missing_product_to_shopping_list(list_id)
 
 async def async_remove_product_in_shopping_list_service(hass, coordinator, data):
     """Removes the given product from the given shopping list"""
@@ -401,10 +642,12 @@ async def async_remove_product_in_shopping_list_service(hass, coordinator, data)
     list_id = data.get(SERVICE_LIST_ID, 1)
     amount = data[SERVICE_AMOUNT]
 
-    def wrapper():
-        coordinator.grocy_api.remove_product_in_shopping_list(product_id, list_id, amount)
-
-    await hass.async_add_executor_job(wrapper)
+    await coordinator.grocy_api.remove_product_in_shopping_list(product_id, list_id, amount)
+    coordinator.async_apply_local_change(
+        ATTR_SHOPPING_LIST,
+        partial(apply_shopping_list_removal, product_id=product_id, amount=amount),
+        [ATTR_SHOPPING_LIST],
+    )
 
 async def _async_force_update_entity(
     coordinator: GrocyDataUpdateCoordinator, entity_key: str
@@ -419,4 +662,4 @@ async def _async_force_update_entity(
         None,
     )
     if entity:
-        await entity.async_update_ha_state(force_refresh=True)
+        await coordinator.async_refresh_datasets([entity_key])
@@ -0,0 +1,170 @@
+"""Persisted snapshot of the last Grocy data."""
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, SNAPSHOT_STORAGE_VERSION
+from .helpers import (
+    BatteryRecord,
+    ChoreRecord,
+    GrocyRecord,
+    MealPlanRecord,
+    ProductRecord,
+    ShoppingListRecord,
+    TaskRecord,
+    VolatileProductRecord,
+)
+from .json_encoder import CustomJSONEncoder
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORD_TYPES = {
+    record_type.__name__: record_type
+    for record_type in (
+        BatteryRecord,
+        ChoreRecord,
+        MealPlanRecord,
+        ProductRecord,
+        ShoppingListRecord,
+        TaskRecord,
+        VolatileProductRecord,
+    )
+}
+
+# Top level date fields are restored to their type, other values stay as
+# they were serialized, which is how they end up in the attributes anyway.
+_DATE_PARSERS: Dict[str, Callable[[str], Any]] = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+}
+
+
+@dataclass
+class GrocySnapshot:
+    """Available entities and datasets of the last successful refresh."""
+
+    available_entities: List[str]
+    data: Dict[str, List[GrocyRecord]]
+
+
+def _date_kind(values: List[Any]) -> str | None:
+    """Return the date type of a column of values, if any."""
+    value = next((value for value in values if value is not None), None)
+    if isinstance(value, datetime):
+        return "datetime"
+    if isinstance(value, date):
+        return "date"
+    return None
+
+
+def encode_dataset(records: List[GrocyRecord]) -> Dict[str, Any]:
+    """Encode a dataset as JSON compatible columns and rows."""
+    if not records:
+        return {"type": None, "fields": [], "dates": {}, "rows": []}
+
+    record_type = type(records[0])
+    rows = [record.values() for record in records]
+    dates = {}
+    for index, name in enumerate(record_type.__slots__):
+        if kind := _date_kind([row[index] for row in rows]):
+            dates[name] = kind
+
+    return {
+        "type": record_type.__name__,
+        "fields": list(record_type.__slots__),
+        "dates": dates,
+        "rows": json.loads(json.dumps(rows, cls=CustomJSONEncoder)),
+    }
+
+
+def decode_dataset(stored: Dict[str, Any]) -> List[GrocyRecord]:
+    """Decode a stored dataset.
+
+    Raises ValueError if it was stored with different record fields.
+    """
+    if stored["type"] is None:
+        return []
+
+    record_type = RECORD_TYPES.get(stored["type"])
+    if record_type is None or tuple(stored["fields"]) != record_type.__slots__:
+        raise ValueError(f"Stored {stored['type']} records do not match")
+
+    parsers: List[Tuple[int, Callable[[str], Any]]] = [
+        (record_type.__slots__.index(name), _DATE_PARSERS[kind])
+        for name, kind in stored["dates"].items()
+    ]
+    records = []
+    for row in stored["rows"]:
+        for index, parse in parsers:
+            if row[index] is not None:
+                row[index] = parse(row[index])
+        records.append(record_type.from_values(row))
+    return records
+
+
+class GrocySnapshotStore:
+    """Store the last Grocy data so entities can be restored before Grocy answers.
+
+    Datasets are encoded column-wise and only re-encoded when they changed.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[Dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry_id}"
+        )
+        # Encoded datasets by key, with the dataset they were encoded from.
+        self._encoded: Dict[str, Tuple[List[GrocyRecord], Dict[str, Any]]] = {}
+
+    async def async_load(self) -> GrocySnapshot | None:
+        """Return the stored snapshot, None if there is none or it is outdated."""
+        stored = await self._store.async_load()
+        if not stored:
+            return None
+
+        try:
+            return GrocySnapshot(
+                available_entities=list(stored["available_entities"]),
+                data={
+                    key: decode_dataset(dataset)
+                    for key, dataset in stored["data"].items()
+                },
+            )
+        except (KeyError, IndexError, TypeError, ValueError) as error:
+            _LOGGER.debug("Ignoring the stored Grocy data: %s", error)
+            return None
+
+    @callback
+    def async_delay_save(self, snapshot_fn: Callable[[], GrocySnapshot]) -> None:
+        """Store the snapshot returned by snapshot_fn after a delay."""
+        self._store.async_delay_save(
+            lambda: self._encode(snapshot_fn()), SNAPSHOT_SAVE_DELAY
+        )
+
+    async def async_remove(self) -> None:
+        """Remove the stored snapshot."""
+        await self._store.async_remove()
+
+    def _encode(self, snapshot: GrocySnapshot) -> Dict[str, Any]:
+        """Encode a snapshot, reusing the encoding of unchanged datasets."""
+        encoded = {}
+        for key, records in snapshot.data.items():
+            if records is None:
+                continue
+            cached = self._encoded.get(key)
+            if cached is None or cached[0] is not records:
+                cached = (records, encode_dataset(records))
+            encoded[key] = cached
+
+        self._encoded = encoded
+        return {
+            "available_entities": snapshot.available_entities,
+            "data": {key: dataset for key, (_, dataset) in encoded.items()},
+        }
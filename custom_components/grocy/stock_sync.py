@@ -0,0 +1,99 @@
+"""Incremental stock sync from Grocy's stock log."""
+from __future__ import annotations
+
+import logging
+from time import monotonic
+from typing import Callable, Dict, Iterable, List
+
+from pygrocy2.grocy_api_client import CurrentStockResponse
+
+from .api import GrocyApi, GrocyApiError
+from .const import STOCK_FULL_SYNC_INTERVAL, STOCK_SYNC_MAX_CHANGES
+from .helpers import ProductRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StockJournalSync:
+    """Keep the stock up to date from the entries of Grocy's stock log.
+
+    A full sync downloads the whole stock. Later syncs read the stock log
+    entries added since then and fetch only the products they affect, so they
+    cost requests per change instead of per product in stock. Product edits
+    and undone bookings add no stock log entries, so a full sync is repeated
+    periodically.
+    """
+
+    def __init__(
+        self,
+        api: GrocyApi,
+        build: Callable[[Iterable[CurrentStockResponse]], List[ProductRecord]],
+    ) -> None:
+        """Initialize the sync."""
+        self._api = api
+        self._build = build
+        self._products: Dict[int, ProductRecord] = {}
+        self._stock: List[ProductRecord] = []
+        self._last_log_id: int | None = None
+        self._last_full_sync = 0.0
+
+    async def async_sync(self) -> List[ProductRecord]:
+        """Return the current stock, the same list if it did not change."""
+        if (
+            self._last_log_id is None
+            or monotonic() - self._last_full_sync
+            >= STOCK_FULL_SYNC_INTERVAL.total_seconds()
+        ):
+            return await self._async_full_sync()
+
+        entries = await self._api.get_stock_log(
+            self._last_log_id, limit=STOCK_SYNC_MAX_CHANGES
+        )
+        if not entries:
+            return self._stock
+        if len(entries) >= STOCK_SYNC_MAX_CHANGES:
+            _LOGGER.debug("Too many stock changes, downloading the whole stock")
+            return await self._async_full_sync()
+
+        product_ids = {int(entry["product_id"]) for entry in entries}
+        stock = await self._api.get_products_stock(product_ids)
+        # The aggregated amounts of parent products include their children.
+        parent_ids = {parent_id for _, parent_id in stock.values() if parent_id}
+        if parent_ids - stock.keys():
+            stock.update(await self._api.get_products_stock(parent_ids - stock.keys()))
+
+        records = {
+            record.id: record
+            for record in self._build(
+                entry for entry, _ in stock.values() if entry is not None
+            )
+        }
+        for product_id in stock:
+            if product_id in records:
+                self._products[product_id] = records[product_id]
+            else:
+                self._products.pop(product_id, None)
+
+        _LOGGER.debug("Synced %d products from the stock log", len(stock))
+        self._last_log_id = max(int(entry["id"]) for entry in entries)
+        self._stock = list(self._products.values())
+        return self._stock
+
+    async def _async_full_sync(self) -> List[ProductRecord]:
+        """Download the whole stock and remember the newest stock log entry."""
+        # The newest entry is read first, changes made while the stock is
+        # downloaded are applied again on the next sync.
+        try:
+            newest = await self._api.get_stock_log(limit=1)
+        except GrocyApiError as error:
+            _LOGGER.debug("Stock log unavailable, downloading the stock: %s", error)
+            newest = None
+
+        stock = self._build(await self._api.get_stock())
+        self._products = {record.id: record for record in stock}
+        self._stock = stock
+        self._last_log_id = None
+        if newest is not None:
+            self._last_log_id = int(newest[0]["id"]) if newest else 0
+        self._last_full_sync = monotonic()
+        return stock
@@ -0,0 +1,46 @@
+"""Pooled HTTP transport for the Grocy API."""
+from __future__ import annotations
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, hdrs
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util import ssl as ssl_util
+
+from .const import KEEPALIVE_TIMEOUT
+
+
+@callback
+def async_create_session(
+    verify_ssl: bool, pool_size: int, request_timeout: float, compress: bool
+) -> ClientSession:
+    """Return a session with its own pool of kept alive connections to Grocy.
+
+    The refreshes, services and picture proxy share the session, so they reuse
+    open connections instead of connecting (and negotiating TLS) for every
+    request. The caller has to close the session.
+    """
+    if verify_ssl:
+        ssl_context = ssl_util.get_default_context()
+    else:
+        ssl_context = ssl_util.get_default_no_verify_context()
+
+    connector = TCPConnector(
+        ssl=ssl_context,
+        limit=pool_size,
+        limit_per_host=pool_size,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+
+    headers = {hdrs.USER_AGENT: SERVER_SOFTWARE}
+    if not compress:
+        headers[hdrs.ACCEPT_ENCODING] = "identity"
+
+    # Pictures are streamed, so only stalled connections and reads time out.
+    # API requests set a total timeout of their own.
+    return ClientSession(
+        connector=connector,
+        headers=headers,
+        timeout=ClientTimeout(
+            total=None, sock_connect=request_timeout, sock_read=request_timeout
+        ),
+    )
@@ -0,0 +1,99 @@
+"""WebSocket API for Grocy."""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DATASETS, DOMAIN, SIGNAL_UNLOADED
+from .coordinator import GrocyDataUpdateCoordinator
+from .helpers import serialize_items
+
+_LOGGER = logging.getLogger(__name__)
+
+ERR_DATASET_UNAVAILABLE = "dataset_unavailable"
+ERR_UNLOADED = "unloaded"
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the Grocy websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+def _index_items(items: List[Any]) -> Dict[Any, Dict[str, Any]]:
+    """Return the serialized items of a dataset by id."""
+    return {item["id"]: item for item in serialize_items(items or [])}
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "grocy/subscribe",
+        vol.Required("dataset"): vol.In(DATASETS),
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Send a snapshot of a dataset, then the changes after each refresh."""
+    coordinator: GrocyDataUpdateCoordinator | None = hass.data.get(DOMAIN)
+    key = msg["dataset"]
+    if coordinator is None or coordinator.data is None or key not in coordinator.data:
+        connection.send_error(
+            msg["id"],
+            ERR_DATASET_UNAVAILABLE,
+            f"Dataset {key} is not kept up to date by an enabled entity",
+        )
+        return
+
+    items = _index_items(coordinator.data[key])
+
+    @callback
+    def forward_changes() -> None:
+        """Send the items that were added, removed or changed."""
+        nonlocal items
+        if coordinator.data is None or key not in coordinator.data:
+            return
+
+        previous = items
+        items = _index_items(coordinator.data[key])
+        added = [item for item_id, item in items.items() if item_id not in previous]
+        removed = [item_id for item_id in previous if item_id not in items]
+        changed = [
+            item
+            for item_id, item in items.items()
+            if item_id in previous and previous[item_id] != item
+        ]
+        if added or removed or changed:
+            connection.send_event(
+                msg["id"], {"added": added, "removed": removed, "changed": changed}
+            )
+
+    remove_listener = coordinator.async_add_listener(forward_changes, key)
+
+    @callback
+    def unsubscribe() -> None:
+        """Stop forwarding the changes."""
+        remove_listener()
+        remove_unload_listener()
+
+    @callback
+    def end_subscription() -> None:
+        """End the subscription, the unloaded coordinator won't refresh anymore."""
+        if connection.subscriptions.pop(msg["id"], None) is not None:
+            unsubscribe()
+            connection.send_error(msg["id"], ERR_UNLOADED, "Grocy was unloaded")
+
+    remove_unload_listener = async_dispatcher_connect(
+        hass, SIGNAL_UNLOADED, end_subscription
+    )
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_event(msg["id"], {"snapshot": list(items.values())})
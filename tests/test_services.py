@@ -0,0 +1,49 @@
+"""Tests for the Grocy service schemas."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from custom_components.grocy.services import (
+    BULK_SERVICES_WITH_ACCOMPANYING_SCHEMA,
+    QUERY_SERVICES_WITH_ACCOMPANYING_SCHEMA,
+    SERVICES_WITH_ACCOMPANYING_SCHEMA,
+)
+
+SERVICES_YAML = (
+    Path(__file__).parent.parent / "custom_components" / "grocy" / "services.yaml"
+)
+SCHEMAS = dict(
+    SERVICES_WITH_ACCOMPANYING_SCHEMA
+    + BULK_SERVICES_WITH_ACCOMPANYING_SCHEMA
+    + QUERY_SERVICES_WITH_ACCOMPANYING_SCHEMA
+)
+DOCUMENTED_SERVICES = yaml.safe_load(SERVICES_YAML.read_text(encoding="utf-8"))
+
+
+def _example_data(fields: dict) -> dict:
+    """Return service data built from the example, or default, of each field."""
+    data = {}
+    for field, description in fields.items():
+        value = description.get("example", description.get("default"))
+        if value is None:
+            continue
+        if isinstance(value, str) and value[:1] in "[{":
+            value = json.loads(value)
+        data[field] = value
+    return data
+
+
+def test_documented_services_are_registered() -> None:
+    """Every documented service has a schema and every schema is documented."""
+    assert set(DOCUMENTED_SERVICES) == set(SCHEMAS)
+
+
+@pytest.mark.parametrize("service", sorted(DOCUMENTED_SERVICES))
+def test_documented_examples_match_schema(service: str) -> None:
+    """The examples in services.yaml pass the schema of their service."""
+    fields = DOCUMENTED_SERVICES[service].get("fields") or {}
+    SCHEMAS[service](_example_data(fields))